@@ -0,0 +1,283 @@
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+import filtros
+from arranque import ciclo_de_vida
+from datos import cargar_datos
+from detalle import detalle
+from escalado import MAXIMO_COCTELES, MAXIMO_LITROS, UNIDADES, escalar
+from metricas import Medicion, texto_prometheus
+from tarjetas import FORMATOS, pedidos_catalogo, zip_tarjetas
+
+# === API de recetas (sin Streamlit) ===
+
+# Expone el mismo catálogo que app.py como JSON, para el kiosco y el bot.
+# Correr con: uvicorn api:app --workers 4
+
+# Las respuestas sólo cambian cuando cambia el libro, así que se pueden
+# cachear un rato en el cliente o en un proxy
+CACHE_CONTROL = "public, max-age=300, stale-while-revalidate=3600"
+
+# Respuestas JSON ya serializadas que se mantienen en memoria
+MAXIMO_EN_CACHE = 1024
+
+
+class ErrorConsulta(Exception):
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+        self.mensaje = mensaje
+
+
+# === Consultas ===
+
+def _lista_cocteles(datos, q, licor, ingredientes):
+    desconocidos = [i for i in ingredientes if i not in datos.matriz.ingredientes]
+    if desconocidos:
+        raise ErrorConsulta(400, f"Ingredientes desconocidos: {', '.join(desconocidos)}")
+    if licor and licor not in (filtros.TODOS, filtros.SIN_ALCOHOL) and licor not in datos.matriz.licores:
+        raise ErrorConsulta(400, f"Licor desconocido: {licor}")
+
+    mascara = filtros.por_palabra(datos, q)
+    mascara = filtros.por_licor(datos, licor, mascara)
+    mascara = filtros.por_ingredientes(datos, ingredientes, mascara)
+    return {"cocteles": filtros.por_relevancia(datos, q, filtros.cocteles(datos, mascara))}
+
+
+def _licores(datos, q):
+    mascara = filtros.por_palabra(datos, q)
+    return {"licores": filtros.opciones_licor(datos, mascara)}
+
+
+def _despensa(datos, inventario, maximo):
+    try:
+        maximo = int(maximo)
+    except ValueError:
+        raise ErrorConsulta(400, "faltantes debe ser un número entero") from None
+    if not 0 <= maximo <= len(datos.despensa.ingredientes):
+        raise ErrorConsulta(400, "faltantes fuera de rango")
+    sugerencias = datos.despensa.sugerencias(inventario, maximo)
+    return {"cocteles": [{"coctel": c, "faltan": f} for c, f in sugerencias]}
+
+
+def _numero(valor, nombre, maximo):
+    if valor is None or valor == "":
+        return None
+    try:
+        numero = float(valor)
+    except ValueError:
+        raise ErrorConsulta(400, f"{nombre} debe ser un número") from None
+    if not math.isfinite(numero):
+        raise ErrorConsulta(400, f"{nombre} debe ser un número finito")
+    if not numero > 0:
+        raise ErrorConsulta(400, f"{nombre} debe ser mayor que 0")
+    if numero > maximo:
+        raise ErrorConsulta(400, f"{nombre} no puede ser mayor que {maximo}")
+    return numero
+
+
+def _receta(datos, coctel, cantidad, litros, unidad):
+    fila = datos.receta(coctel)
+    if fila is None:
+        raise ErrorConsulta(404, f"Cóctel desconocido: {coctel}")
+    if unidad not in UNIDADES:
+        raise ErrorConsulta(400, f"Unidad desconocida: {unidad}")
+    cantidad = _numero(cantidad, "cantidad", MAXIMO_COCTELES)
+    litros = _numero(litros, "litros", MAXIMO_LITROS)
+    if litros is not None:
+        # En volumen total la app muestra siempre ml
+        cantidad, unidad = None, "ml"
+    elif cantidad is None:
+        cantidad = 1
+
+    tabla = escalar(datos, [(coctel, cantidad, litros)], unidad)
+    ingredientes = [
+        {
+            "ingrediente": f.ingrediente,
+            "nombre": f.nombre,
+            "categoria": f.categoria,
+            "cantidad": round(float(f.cantidad), 2),
+            "unidad": f.unidad,
+            "linea": f.linea,
+        }
+        for f in tabla.itertuples(index=False)
+    ]
+
+    info = asdict(detalle(datos, coctel))
+    info["tecnica"] = fila["tecnica"]
+    info["vaso"] = fila["vaso"]
+    info["capacidad_vaso_ml"] = int(fila["capacidad_vaso_sin_hielo"])
+    del info["cristaleria"]
+    return {
+        **info,
+        "pedido": {"cantidad": cantidad, "litros": litros, "unidad": unidad},
+        "ingredientes": ingredientes,
+    }
+
+
+# Cuerpos JSON ya calculados, del menos al más usado. La clave es
+# (huella del libro, consulta, argumentos) y no `datos`: al recargar el libro
+# las entradas viejas no mantienen viva la versión anterior de los datos
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+# Cuerpo JSON de una consulta, calculado una vez por consulta y versión de
+# los datos
+def _cuerpo(datos, consulta, *argumentos):
+    clave = (datos.huella, consulta, argumentos)
+    with _cache_lock:
+        cuerpo = _cache.get(clave)
+        if cuerpo is not None:
+            _cache.move_to_end(clave)
+            return cuerpo
+
+    resultado = CONSULTAS[consulta](datos, *argumentos)
+    cuerpo = json.dumps(resultado, ensure_ascii=False, default=str).encode("utf-8")
+    with _cache_lock:
+        _cache[clave] = cuerpo
+        while len(_cache) > MAXIMO_EN_CACHE:
+            _cache.popitem(last=False)
+    return cuerpo
+
+
+CONSULTAS = {
+    "cocteles": _lista_cocteles,
+    "licores": _licores,
+    "receta": _receta,
+    "despensa": _despensa,
+}
+
+
+# La ETag depende sólo de la versión de los datos y de la consulta, así que
+# un 304 se contesta sin calcular nada. Para la receta de un cóctel basta su
+# propia versión: al recargar el libro, los que no cambiaron siguen valiendo
+def _etag(datos, consulta, argumentos):
+    if consulta == "receta" and argumentos[0] in datos.versiones:
+        version = datos.versiones[argumentos[0]]
+    else:
+        version = datos.huella
+    clave = json.dumps([version, consulta, argumentos], ensure_ascii=False)
+    return '"' + hashlib.sha256(clave.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def _responder(request, consulta, *argumentos):
+    medicion = Medicion(f"api/{consulta}")
+    try:
+        return _responder_medido(medicion, request, consulta, *argumentos)
+    finally:
+        medicion.cerrar()
+
+
+def _responder_medido(medicion, request, consulta, *argumentos):
+    medicion.marca("datos")
+    datos = cargar_datos()
+    etag = _etag(datos, consulta, argumentos)
+    encabezados = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+    pedidas = request.headers.get("if-none-match", "")
+    if etag in (e.strip().removeprefix("W/") for e in pedidas.split(",")) or pedidas.strip() == "*":
+        return Response(status_code=304, headers=encabezados)
+
+    medicion.marca("consulta")
+    try:
+        cuerpo = _cuerpo(datos, consulta, *argumentos)
+    except ErrorConsulta as e:
+        return JSONResponse({"error": e.mensaje}, status_code=e.estado)
+    return Response(cuerpo, media_type="application/json", headers=encabezados)
+
+
+# === Rutas ===
+
+# Las rutas que consultan los datos son funciones normales y no async:
+# Starlette las corre en su pool de hilos, así una consulta que no está en el
+# cache (pandas, numpy, imágenes) no detiene al resto de las conexiones
+
+# GET /cocteles?q=limon&licor=Gin&ingrediente=Vermouth+Rosso&ingrediente=...
+def cocteles(request):
+    params = request.query_params
+    return _responder(
+        request, "cocteles",
+        params.get("q", ""),
+        params.get("licor", filtros.TODOS),
+        tuple(sorted(set(params.getlist("ingrediente")))),
+    )
+
+
+# GET /licores?q=...  (opciones del selector de licor base)
+def licores(request):
+    return _responder(request, "licores", request.query_params.get("q", ""))
+
+
+# GET /cocteles/{coctel}?cantidad=3&unidad=oz  o  ?litros=1.5
+def receta(request):
+    params = request.query_params
+    return _responder(
+        request, "receta",
+        request.path_params["coctel"],
+        params.get("cantidad"),
+        params.get("litros"),
+        params.get("unidad", "ml"),
+    )
+
+
+# GET /despensa?tengo=Gin&tengo=Campari&faltantes=1  (¿qué puedo preparar?)
+def despensa(request):
+    params = request.query_params
+    return _responder(
+        request, "despensa",
+        tuple(sorted(set(params.getlist("tengo")))),
+        params.get("faltantes", "2"),
+    )
+
+
+# GET /tarjetas?coctel=Negroni&coctel=...&formato=png&cantidad=10&unidad=oz
+# Zip con una tarjeta imprimible por cóctel (todo el catálogo si no se
+# indican), que se envía a medida que se dibujan (ver tarjetas.py)
+def tarjetas(request):
+    params = request.query_params
+    datos = cargar_datos()
+    try:
+        formato = params.get("formato", "pdf").upper()
+        if formato not in FORMATOS:
+            raise ErrorConsulta(400, f"Formato desconocido: {formato.lower()}")
+        unidad = params.get("unidad", "ml")
+        if unidad not in UNIDADES:
+            raise ErrorConsulta(400, f"Unidad desconocida: {unidad}")
+        cocteles = list(dict.fromkeys(params.getlist("coctel")))
+        desconocidos = [c for c in cocteles if datos.receta(c) is None]
+        if desconocidos:
+            raise ErrorConsulta(404, f"Cócteles desconocidos: {', '.join(desconocidos)}")
+        cantidad = _numero(params.get("cantidad"), "cantidad", MAXIMO_COCTELES) or 1
+    except ErrorConsulta as e:
+        return JSONResponse({"error": e.mensaje}, status_code=e.estado)
+
+    return StreamingResponse(
+        zip_tarjetas(pedidos_catalogo(datos, cocteles, cantidad), unidad, formato),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="tarjetas.zip"'},
+    )
+
+
+# GET /metrics  (tiempos por consulta, formato Prometheus)
+async def metricas(request):
+    return Response(texto_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+# Cada worker precalienta los datos y vigila el libro (ver arranque.py)
+app = Starlette(lifespan=ciclo_de_vida, routes=[
+    Route("/cocteles", cocteles),
+    Route("/licores", licores),
+    Route("/cocteles/{coctel}", receta),
+    Route("/despensa", despensa),
+    Route("/tarjetas", tarjetas),
+    Route("/metrics", metricas),
+])
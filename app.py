@@ -1,15 +1,46 @@
 import streamlit as st
 import pandas as pd
-from PIL import Image
-import base64
-from io import BytesIO
+import numpy as np
 import re
-import random
+
+import enlaces
+import filtros
+import recarga
+from compras import lista_compras
+from datos import cargar_datos
+from detalle import detalle
+from escalado import MAXIMO_COCTELES, MAXIMO_LITROS, escalar
+from imagenes import derivada, en_linea
+from metricas import Medicion
+from tarjetas import pedidos_catalogo, zip_tarjetas
 
 # === Configuración de la página ===
 
 st.set_page_config(page_title="Club de Licores", page_icon="imagenes/favicon.ico")
 
+# === Tiempos del rerun ===
+
+# Cada etapa del script marca su inicio (ver metricas.py). Con ?debug=1 en la
+# URL se muestra el desglose del rerun actual al final de la barra lateral.
+medicion = Medicion()
+modo_debug = st.query_params.get("debug") == "1"
+
+
+# Publica los tiempos y, en modo debug, los muestra. Se llama al final del
+# script y antes de cada st.stop()
+def terminar_rerun(detener=False):
+    medicion.cerrar()
+    if modo_debug:
+        with st.sidebar.expander("⏱️ Tiempos del rerun"):
+            st.text("\n".join(
+                f"{tramo:<28}{segundos * 1000:>9.1f} ms" for tramo, segundos in medicion.tramos
+            ) + f"\n{'total':<28}{medicion.total * 1000:>9.1f} ms")
+    if detener:
+        st.stop()
+
+
+medicion.marca("estilos")
+
 #  === Inyección de estilos adaptativos  === 
 st.markdown("""
     <style>
@@ -59,15 +90,10 @@ st.markdown(
 
 # === Encabezado ===
 
-# Convertir imagen a base64
-def image_to_base64(img):
-    buffered = BytesIO()
-    img.save(buffered, format="PNG")
-    return base64.b64encode(buffered.getvalue()).decode()
-
-# Cargar y convertir imagen
-logo = Image.open("imagenes/icon.png").convert("RGBA")
-logo_base64 = image_to_base64(logo)
+# Logo en base64: se reduce al doble del ancho mostrado, se cuantiza y se
+# calcula una sola vez por proceso, así el bloque HTML es idéntico en cada rerun
+medicion.marca("encabezado")
+logo = en_linea("imagenes/icon.png", ancho=180, colores=256)
 
 # Encabezado
 col1, col2 = st.columns([1, 5])  # mantener buen ancho para el logo
@@ -76,7 +102,7 @@ with col1:
     st.markdown(
         f"""
         <div style='display: flex; align-items: center; justify-content: flex-start; margin-top: 30px;'>
-            <img src='data:image/png;base64,{logo_base64}' width='90'>
+            <img src='{logo}' width='90'>
         </div>
         """,
         unsafe_allow_html=True
@@ -119,85 +145,54 @@ with col2:
 st.markdown("<hr style='margin-top: 10px; margin-bottom: 20px;'>", unsafe_allow_html=True)
 
 # === Cargar datos ===
-recetas = pd.read_excel("data/recetas.xlsx", sheet_name="receta")
-complementos = pd.read_excel("data/recetas.xlsx", sheet_name="complementos")
-tecnicas = pd.read_excel("data/recetas.xlsx", sheet_name="tecnicas")
-jarabes = pd.read_excel("data/recetas.xlsx", sheet_name="jarabe")
-recursos = pd.read_excel("data/recetas.xlsx", sheet_name="recurso")
-
-# === Sidebar ===
-st.sidebar.title("Opciones")
+# El libro se parsea una sola vez por proceso (y se compila a .cache/); un
+# hilo en segundo plano lo recarga cuando data/recetas.xlsx cambia, sin
+# reiniciar el servidor (ver recarga.py)
+medicion.marca("datos")
+recarga.iniciar()
+datos = cargar_datos()
+recetas = datos.recetas
+
+# === Estado en la URL ===
+# Al abrir la sesión, los parámetros de la URL dan los valores iniciales de
+# los widgets; en cada rerun la URL se actualiza con la selección actual, así
+# se puede compartir un enlace a la misma vista (ver enlaces.py)
+if "url_leida" not in st.session_state:
+    st.session_state.url_leida = True
+    iniciales = {**enlaces.PREDETERMINADOS, **enlaces.leer(st.query_params.to_dict())}
+else:
+    iniciales = dict(enlaces.PREDETERMINADOS)
 
-# === Identificar columnas ===
-columnas_licor = recetas.columns[8:56]
 
-# === Paso 1: Aplicar filtro por palabra clave ===
-palabra_clave = st.session_state.get("palabra_clave_input", "").strip().lower()
-
-recetas_filtradas = recetas.copy()
-if palabra_clave:
-    def cocteles_con_palabra(df, col_coctel="coctel"):
-        df = df.copy()
-        df = df.fillna("").astype(str)
-        df["texto_total"] = df.drop(columns=[col_coctel]).agg(" ".join, axis=1).str.lower()
-        # Coincidencia también en el nombre del cóctel
-        coincidencias_nombre = df[df[col_coctel].str.lower().str.contains(palabra_clave)][col_coctel]
-        coincidencias_texto = df[df["texto_total"].str.contains(palabra_clave)][col_coctel]
-        return set(coincidencias_nombre) | set(coincidencias_texto)
-    
-    def cocteles_con_palabra_en_recetas(df, col_coctel="coctel"):
-        df = df.copy()
-        df = df.fillna("").astype(str)
-        texto_filas = df.drop(columns=[col_coctel]).agg(" ".join, axis=1).str.lower()
-
-        # Coincidencia en columnas (nombres de columna)
-        columnas_con_match = [col for col in df.columns if palabra_clave in col.lower()]
-
-        desde_texto = df[texto_filas.str.contains(palabra_clave)][col_coctel]
-        desde_nombre = df[df[col_coctel].str.lower().str.contains(palabra_clave)][col_coctel]
-
-        if columnas_con_match:
-            cols_numericas = df[columnas_con_match].apply(pd.to_numeric, errors='coerce').fillna(0)
-            desde_columnas = df[cols_numericas.sum(axis=1) > 0][col_coctel]
-        else:
-            desde_columnas = pd.Series([], dtype=str)
+# Escribe en la URL solo los parámetros que cambiaron
+def actualizar_url(estado):
+    for parametro, valor in enlaces.escribir(estado).items():
+        if valor is None:
+            if parametro in st.query_params:
+                del st.query_params[parametro]
+        elif st.query_params.get(parametro) != valor:
+            st.query_params[parametro] = valor
 
-        return set(desde_texto) | set(desde_nombre) | set(desde_columnas)
 
-    # Unimos los resultados de todas las fuentes
-    cocteles_validos = sorted(set(
-        cocteles_con_palabra_en_recetas(recetas) |
-        cocteles_con_palabra_en_recetas(complementos) |
-        cocteles_con_palabra(recursos)
-    ))
-
-    # Filtrar
-    recetas_filtradas = recetas[recetas["coctel"].isin(cocteles_validos)]
-    complementos_filtrados = complementos[complementos["coctel"].isin(cocteles_validos)]
-    recursos_filtrados = recursos[recursos["coctel"].isin(cocteles_validos)]
+# === Sidebar ===
+st.sidebar.title("Opciones")
 
-else:
-    complementos_filtrados = complementos
-    recursos_filtrados = recursos
+# === Paso 1: Aplicar filtro por palabra clave ===
+# Los filtros se expresan como máscaras sobre las filas de recetas (ver filtros.py)
+medicion.marca("filtro/1 palabra clave")
+palabra_clave = st.session_state.get("palabra_clave_input", iniciales["palabra_clave_input"]).strip().lower()
+mascara_filtrada = filtros.por_palabra(datos, palabra_clave)
 
 # === Paso 2: Obtener opciones disponibles actualizadas ===
-licores_disponibles = [
-    col for col in columnas_licor
-    if recetas_filtradas[col].fillna(0).sum() > 0
-]
+# Licores presentes en los cócteles filtrados, más "Sin Alcohol" si corresponde
+medicion.marca("filtro/2 opciones de licor")
+opciones_licor = filtros.opciones_licor(datos, mascara_filtrada)
 
 # === Paso 3: Obtener selección actual o default ===
-licor_actual = st.session_state.get("licor_sel", "Todos")
-
-# === Paso 4: Selectores de licor e ingrediente ===
-# Verificamos si hay cócteles sin alcohol en las recetas filtradas
-hay_sin_alcohol = recetas_filtradas[columnas_licor].fillna(0).sum(axis=1).eq(0).any()
-
-# Armamos el selector dinámicamente
-opciones_licor = ["Todos"] + sorted(licores_disponibles)
-if hay_sin_alcohol and "Sin Alcohol" not in opciones_licor:
-    opciones_licor.append("Sin Alcohol")
+licor_actual = st.session_state.get("licor_sel", iniciales["licor_sel"])
 
+# === Paso 4: Selector de licor ===
+medicion.marca("filtro/4 selector de licor")
 licor_sel = st.sidebar.selectbox(
     "Filtra por licor base",
     opciones_licor,
@@ -207,239 +202,213 @@ licor_sel = st.sidebar.selectbox(
 )
 
 # === Paso 5: Aplicar filtro por licor ===
-recetas_final = recetas_filtradas.copy()
-
-if st.session_state.licor_sel == "Sin Alcohol":
-    recetas_final = recetas_final[recetas_final[columnas_licor].fillna(0).sum(axis=1) == 0]
-elif st.session_state.licor_sel != "Todos":
-    recetas_final = recetas_final[recetas_final[st.session_state.licor_sel].fillna(0) > 0]
+medicion.marca("filtro/5 licor")
+mascara_final = filtros.por_licor(datos, st.session_state.licor_sel, mascara_filtrada)
 
 # === Paso 6: Mostrar campo de búsqueda por palabra clave ===
+medicion.marca("filtro/6 campo de búsqueda")
 palabra_clave_input = st.sidebar.text_input(
     "Buscar por palabra clave",
-    value=st.session_state.get("palabra_clave_input", ""),
+    value=st.session_state.get("palabra_clave_input", iniciales["palabra_clave_input"]),
     key="palabra_clave_input",
     placeholder="Ej: jengibre, limón, Borges",
     help="Escribe una palabra y presiona Enter para buscar"
 )
 
 # === Paso 7: Selector de cóctel dependiente ===
-cocteles = sorted(recetas_final["coctel"].dropna().unique())
+medicion.marca("filtro/7 selector de cóctel")
+# Con palabra clave, los más relevantes primero
+cocteles = filtros.por_relevancia(datos, palabra_clave, filtros.cocteles(datos, mascara_final))
+
+# Cóctel elegido en "Cócteles similares" (ver ir_a_coctel)
+coctel_destino = st.session_state.pop("coctel_destino", None)
 
 if cocteles:
+    # El pedido en "Cócteles similares", el ya elegido, el de la URL o, si no
+    # hay ninguno, el cóctel del día (el mismo para todos: sin azar, la misma
+    # URL muestra siempre lo mismo)
+    candidatos = [coctel_destino, st.session_state.get("coctel_sel"), iniciales.get("coctel_sel")]
+    coctel_inicial = next((c for c in candidatos if c in cocteles), None) or filtros.coctel_del_dia(cocteles)
     coctel_sel = st.sidebar.selectbox(
         "Selecciona un cóctel",
         cocteles,
-        index=cocteles.index(
-            st.session_state.coctel_sel
-        ) if "coctel_sel" in st.session_state and st.session_state.coctel_sel in cocteles else cocteles.index(random.choice(cocteles)),
+        index=cocteles.index(coctel_inicial),
         key="coctel_sel"
     )
 else:
     if "coctel_sel" in st.session_state:
         del st.session_state["coctel_sel"]
     st.sidebar.warning("No hay cócteles para esa búsqueda, inténtalo otra vez.")
-    st.stop()
+    actualizar_url({"palabra_clave_input": palabra_clave_input, "licor_sel": licor_sel, "coctel_sel": None})
+    terminar_rerun(detener=True)
 
 # === Selector tipo de cálculo  ===
 
 # Escoger tipo de cálculo con control de estado limpio
-modo_por_defecto = "Cantidad de cócteles"
+medicion.marca("cantidades")
+# Establecer valor predeterminado (o el de la URL) si no existe
+modo_actual = st.session_state.get("modo_forzado", iniciales["modo_forzado"])
 
-# Establecer valor predeterminado si no existe
-modo_actual = st.session_state.get("modo_forzado", modo_por_defecto)
+modos = ["Cantidad de cócteles", "Volumen total (litros)", "Menú de evento", "¿Qué puedo preparar?"]
 
 modo = st.sidebar.radio(
     "Tipo de cantidad",
-    ["Cantidad de cócteles", "Volumen total (litros)"],
-    index=["Cantidad de cócteles", "Volumen total (litros)"].index(modo_actual),
+    modos,
+    index=modos.index(modo_actual),
     key="modo_forzado"
 )
 
-# Escoger unidad de medida según modo
-unidad_opciones = {
-    "Mililitros (ml)": "ml",
-    "Onzas (oz)": "oz"
-}
-
-# Definir valor por defecto para la interfaz visual
-unidad_predeterminada = "Mililitros (ml)"
-unidad_label_actual = st.session_state.get("unidad_label", unidad_predeterminada)
-
-if modo == "Cantidad de cócteles":
-    unidad_label = st.sidebar.radio(
-        "Unidad de medida",
-        options=list(unidad_opciones.keys()),
-        index=list(unidad_opciones.keys()).index(unidad_label_actual),
-        key="unidad_label"
-    )
-    unidad = unidad_opciones[unidad_label]
+# Unidad y cantidad de la barra lateral (su lugar queda reservado aquí; ver
+# el fragmento `cantidades` más abajo)
+zona_cantidades = st.sidebar.container()
 
-else:
-    # Forzar visualización y lógica a Mililitros (ml)
-    unidad_label = st.sidebar.radio(
-        "Unidad de medida",
-        ["Mililitros (ml)"],
-        index=0,
-        key="unidad_label"
-    )
-    unidad = "ml"
 
+# Controles de unidad y cantidad según el modo; devuelve (unidad, cantidad, litros)
+def controles_cantidad(modo):
+    # Escoger unidad de medida según modo
+    unidad_opciones = {
+        "Mililitros (ml)": "ml",
+        "Onzas (oz)": "oz"
+    }
 
-factor_conversion = 1 if unidad == "ml" else 1 / 30
+    # Definir valor por defecto (o el de la URL) para la interfaz visual
+    unidad_label_actual = st.session_state.get("unidad_label", iniciales["unidad_label"])
 
-if modo == "Cantidad de cócteles":
-    # Controlar valor predeterminado de cantidad
-    cantidad_predeterminada = 1
-    cantidad_actual = st.session_state.get("cantidad", cantidad_predeterminada)
+    if modo != "Volumen total (litros)":
+        unidad_label = st.radio(
+            "Unidad de medida",
+            options=list(unidad_opciones.keys()),
+            index=list(unidad_opciones.keys()).index(unidad_label_actual),
+            key="unidad_label"
+        )
+        unidad = unidad_opciones[unidad_label]
 
-    cantidad = st.sidebar.number_input(
-        "Número de cócteles",
-        min_value=1,
-        value=cantidad_actual,
-        key="cantidad"
-    )
-    volumen_deseado = None
-    litros = None
+    else:
+        # Forzar visualización y lógica a Mililitros (ml)
+        unidad_label = st.radio(
+            "Unidad de medida",
+            ["Mililitros (ml)"],
+            index=0,
+            key="unidad_label"
+        )
+        unidad = "ml"
+
+    if modo == "Cantidad de cócteles":
+        # Controlar valor predeterminado de cantidad
+        cantidad_actual = st.session_state.get("cantidad", iniciales["cantidad"])
+
+        cantidad = st.number_input(
+            "Número de cócteles",
+            min_value=1,
+            max_value=MAXIMO_COCTELES,
+            value=cantidad_actual,
+            key="cantidad"
+        )
+        litros = None
+
+    elif modo == "Volumen total (litros)":
+        opciones_litros = [i * 0.5 for i in range(1, 21)]  # De 0.5 a 10 litros
+
+        # Controlar valor predeterminado para litros (1 litro, o el de la URL
+        # si es una de las opciones)
+        litros_actual = st.session_state.get("litros", iniciales["litros"])
+        if litros_actual not in opciones_litros:
+            litros_actual = enlaces.PREDETERMINADOS["litros"]
+
+        litros = st.selectbox(
+            "Litros totales",
+            opciones_litros,
+            index=opciones_litros.index(litros_actual),
+            format_func=lambda x: str(int(x)) if x == int(x) else str(x).replace(".", ","),
+            key="litros"
+        )
+        cantidad = None
+
+    else:
+        # Menú de evento: las cantidades se indican por cóctel en la tabla del menú.
+        # ¿Qué puedo preparar?: no se muestran cantidades
+        cantidad = 1
+        litros = None
+
+    return unidad, cantidad, litros
+
+
+# En las vistas de un cóctel, la unidad y la cantidad solo cambian la lista
+# de ingredientes: son un fragmento, y al cambiarlas se vuelve a ejecutar solo
+# esta función (los controles y la lista, escrita en `zona`), no toda la app
+@st.fragment
+def cantidades(modo, coctel, zona):
+    medicion_fragmento = Medicion("fragmento/cantidades")
+    medicion_fragmento.marca("controles")
+    unidad, cantidad, litros = controles_cantidad(modo)
+    actualizar_url({
+        "modo_forzado": modo,
+        "unidad_label": st.session_state.get("unidad_label"),
+        "cantidad": cantidad,
+        "litros": litros,
+    })
+
+    # Escalar los ingredientes al volumen pedido y convertirlos a la unidad
+    # elegida (ver escalado.py)
+    medicion_fragmento.marca("escalado")
+    lineas_ingredientes = escalar(datos, [(coctel, cantidad, litros)], unidad)["linea"]
+
+    medicion_fragmento.marca("ingredientes")
+    with zona.container():
+        st.markdown("### Ingredientes")
+
+        for linea in lineas_ingredientes:
+            st.write(f"- {linea}")
+    medicion_fragmento.cerrar()
 
-else:
-    opciones_litros = [i * 0.5 for i in range(1, 21)]  # De 0.5 a 10 litros
-
-    # Controlar valor predeterminado para litros (por ejemplo, 1 litro)
-    litros_predeterminados = opciones_litros[1]  # es 1.0
-    litros_actual = st.session_state.get("litros", litros_predeterminados)
-
-    litros = st.sidebar.selectbox(
-        "Litros totales",
-        opciones_litros,
-        index=opciones_litros.index(litros_actual),
-        format_func=lambda x: str(int(x)) if x == int(x) else str(x).replace(".", ","),
-        key="litros"
-    )
-    cantidad = None
-    volumen_deseado = litros * 1000
 
 # === Verificar selección válida de cóctel antes de continuar ===
 if coctel_sel:
-    receta_seleccionada = recetas[recetas["coctel"] == coctel_sel]
-    
-    if not receta_seleccionada.empty:
-        fila_receta = receta_seleccionada.iloc[0]
-    else:
+    fila_receta = datos.receta(coctel_sel)
+
+    if fila_receta is None:
         st.warning("No se encontró información para el cóctel seleccionado.")
-        st.stop()
+        terminar_rerun(detener=True)
 else:
     st.info("Selecciona un cóctel para ver los detalles.")
-    st.stop()
-
-# === Obtener ingredientes de la receta seleccionada ===
-ingredientes = fila_receta.drop([
-    "coctel", "vaso", "tecnica", "capacidad_vaso_sin_hielo",
-    "cantidad_hielo", "hielo", "capacidad_vaso_con_hielo", "volumen"
-])
-ingredientes = ingredientes[ingredientes.notna() & (ingredientes != 0)]
+    terminar_rerun(detener=True)
+
+if modo in ("Cantidad de cócteles", "Volumen total (litros)"):
+    # Título e imagen van antes de la lista de ingredientes (ver "Visualización central")
+    cabecera = st.container()
+    zona_ingredientes = st.empty()
+    with zona_cantidades:
+        cantidades(modo, coctel_sel, zona_ingredientes)
+else:
+    with zona_cantidades:
+        unidad, cantidad, litros = controles_cantidad(modo)
+
+# La cantidad la escribe el fragmento; el resto de la selección, aquí
+actualizar_url({
+    "palabra_clave_input": palabra_clave_input,
+    "licor_sel": licor_sel,
+    "coctel_sel": coctel_sel,
+    "modo_forzado": modo,
+    **({} if modo in ("Cantidad de cócteles", "Volumen total (litros)") else {
+        "unidad_label": st.session_state.get("unidad_label"),
+        "cantidad": None,
+        "litros": None,
+    }),
+})
 
 # === Botón de limpiar filtros ===
-CAMPOS_RESET = ["licor_sel", "coctel_sel", "unidad_label", "cantidad", "litros", "palabra_clave_input", "modo_forzado"]
+CAMPOS_RESET = ["licor_sel", "coctel_sel", "unidad_label", "cantidad", "litros", "palabra_clave_input", "modo_forzado", "menu_cocteles", "menu_pedidos", "despensa", "tarjetas_alcance", "tarjetas_formato"]
 
 if st.sidebar.button("Limpiar selección"):
-    for clave in CAMPOS_RESET:
-        st.session_state.pop(clave, None)
+    for clave in list(st.session_state):
+        # Las tablas del menú tienen una key por combinación de cócteles y
+        # los interruptores de recursos una por cóctel
+        if clave in CAMPOS_RESET or clave.startswith(("menu_tabla:", "ver_recursos:")):
+            st.session_state.pop(clave, None)
     st.rerun()
 
-# Cálculo de volumen y factor
-# 1. Obtener volumen base y volumen deseado
-volumen_base = fila_receta["volumen"]
-if modo == "Cantidad de cócteles":
-    volumen_deseado = cantidad * volumen_base
-else:
-    volumen_deseado = litros * 1000
-
-# 2. Calcular factor de escalado
-factor = volumen_deseado / volumen_base
-
-# 3. Calcular ingredientes escalados en ml (todos los ingredientes, sin excluir)
-ingredientes_escalados_ml = ingredientes * factor
-
-ingredientes_a_gusto = {
-    "Sal": "sal",
-    "Sal de Apio": "sal de apio",
-    "Pimienta": "pimienta",
-    "Canela": "canela",
-    "Nuez Moscada": "nuez moscada",
-    "Whisky o Brandy": "whisky o brandy",
-    "Leche Condensada": "leche condensada",
-    "Anís Estrella": "anís estrella"
-}
-
-ingredientes_gotas = {
-    "Amargo de Angostura": "Amargo de Angostura",
-    "Salsa Inglesa": "Salsa Inglesa",
-    "Salsa Tabasco": "Salsa Tabasco",
-    "Agua": "agua",
-    "Esencia de Vainilla 2": "esencia de vainilla",
-    "Agua de Azahar": "agua de azahar"
-}
-
-ingredientes_unidades = {
-    "Terrón de Azúcar": "terrón de azúcar",
-    "Hojas de Menta": "hojas de menta",
-    "Hojas de Albahaca": "hojas de albahaca",
-    "Limón Sutil Trozado": "limón sutil trozado",
-    "Trozos de Pepino": "trozos de pepino",
-    "Trozos de Jengibre": "trozos de jengibre",
-    "Frutillas Trozadas": "frutillas trozadas",
-    "Moras": "moras",
-    "Frambuesas": "frambuesas",
-    "Arándanos": "arándanos",
-    "Uvas": "uvas",
-    "Rama de Canela": "rama(s) de canela",
-    "Clavos de Olor": "clavo(s) de olor",
-    "Naranja en Rodajas": "naranja(s) en rodajas",	
-    "Manzana en Cubos": "manzana(s) en cubos",
-    "Huevo": "huevo(s)",
-    "Melón": "melón tuna entero",
-    "Durazno Trozado": "durazno(s) en cubos",
-    "Cascarita de Naranja": "cascarita(s) de naranja"
-}
-
-ingredientes_cucharaditas = {
-    "Azúcar Flor": "azúcar flor (glas)",
-    "Harina Tostada": "harina tostada",
-    "Cacao": "cacao en polvo sin azúcar",
-    "Esencia de Vainilla 3": "esencia de vainilla",
-    "Café Instantáneo": "café instantáneo"
-}
-
-ingredientes_cucharadas = {
-    "Azúcar": "azúcar",
-     "Café Instantáneo 2": "café instantáneo"
-}
-
-ingredientes_tazas = {
-    "Azúcar 2": "azúcar",
-}
-
-ingredientes_gramos = {
-    "Chirimoya": "chirimoya",
-    "Frutillas": "frutillas",
-    "Mango": "mango maduro",
-    "Azúcar 3": "azúcar",
-    "Leche Condensada 2": "leche condensada"
-}
-
-# 4. Convertir a la unidad final (solo líquidos u otros convertibles)
-ingredientes_a_excluir = set(ingredientes_a_gusto) | set(ingredientes_gotas) | set(ingredientes_unidades) | set(ingredientes_cucharadas) | set(ingredientes_tazas) | set(ingredientes_gramos)
-ingredientes_convertibles = [ing for ing in ingredientes.index if ing not in ingredientes_a_excluir]
-
-ingredientes_ajustados = ingredientes_escalados_ml.copy()
-for ing in ingredientes_convertibles:
-    ingredientes_ajustados[ing] *= factor_conversion
-
-# === Datos de técnica ===
-tecnica_info = tecnicas[tecnicas["tecnica"] == fila_receta["tecnica"]].iloc[0]
-
 # === Cantidad de recetas de cócteles ===
+medicion.marca("barra lateral")
 st.sidebar.markdown("---")  # línea separadora
 
 total_cocteles = recetas["coctel"].nunique()
@@ -463,225 +432,281 @@ st.sidebar.markdown(f"""
 </div>
 """, unsafe_allow_html=True)
 
-# === Visualización central ===
+# === Menú de evento ===
+medicion.marca("menú de evento")
+if modo == "Menú de evento":
+    st.markdown("<h3 style='font-size: 48px; color: #e63118; font-weight: bold;'>Menú de evento</h3>", unsafe_allow_html=True)
+
+    menu = st.multiselect(
+        "Cócteles del menú",
+        filtros.cocteles(datos, filtros.todos(datos)),
+        default=[coctel_sel],
+        key="menu_cocteles",
+        placeholder="Elige los cócteles del evento"
+    )
 
-st.markdown(f"<h3 style='font-size: 48px; color: #e63118; font-weight: bold;'>{coctel_sel}</h3>", unsafe_allow_html=True)
+    if not menu:
+        st.info("Agrega cócteles al menú para ver la lista de compras.")
+        terminar_rerun(detener=True)
+
+    # Número de cócteles (o litros) de cada trago del menú. Se guardan por
+    # nombre en menu_pedidos: el editor recuerda sus cambios por posición de
+    # fila, así que se vuelve a crear (otra key) cada vez que cambia el menú y
+    # arranca desde lo guardado
+    pedidos_menu = st.session_state.setdefault("menu_pedidos", {})
+    tabla_menu = st.data_editor(
+        pd.DataFrame([
+            {"Cóctel": c, **pedidos_menu.get(c, {"Cócteles": 10, "Litros": np.nan})} for c in menu
+        ]),
+        column_config={
+            "Cócteles": st.column_config.NumberColumn(min_value=0, max_value=MAXIMO_COCTELES, step=1),
+            "Litros": st.column_config.NumberColumn(
+                min_value=0.0, max_value=MAXIMO_LITROS, step=0.5, help="Si se indica, reemplaza al número de cócteles"
+            ),
+        },
+        disabled=["Cóctel"],
+        hide_index=True,
+        key="menu_tabla:" + "|".join(menu)
+    )
+    for fila in tabla_menu.to_dict("records"):
+        pedidos_menu[fila["Cóctel"]] = {"Cócteles": fila["Cócteles"], "Litros": fila["Litros"]}
+
+    pedidos = [
+        (fila["Cóctel"], None, fila["Litros"]) if pd.notna(fila["Litros"]) and fila["Litros"] > 0
+        else (fila["Cóctel"], fila["Cócteles"], None)
+        for _, fila in tabla_menu.iterrows()
+        if (pd.notna(fila["Litros"]) and fila["Litros"] > 0) or fila["Cócteles"] > 0
+    ]
+
+    st.markdown("### Lista de compras")
+    if pedidos:
+        # Todo el menú se agrega en una sola pasada sobre la matriz de recetas
+        for linea in lista_compras(datos, pedidos, unidad)["linea"]:
+            st.write(f"- {linea}")
+    else:
+        st.info("Indica cuántos cócteles o litros necesitas de cada trago.")
+
+    # Tarjetas de receta para imprimir (ver tarjetas.py). Se dibujan recién al
+    # pulsar el botón, en otros procesos. Streamlit guarda el resultado entero
+    # antes de enviarlo, así que aquí el zip completo queda en memoria; para
+    # enviarlo a medida que se dibuja está GET /tarjetas en api.py (o la
+    # consola: python tarjetas.py)
+    st.markdown("### Tarjetas para imprimir")
+    col_tarjetas, col_formato = st.columns(2)
+    alcance_tarjetas = col_tarjetas.radio(
+        "Cócteles", ["Los del menú", "Todo el catálogo"], horizontal=True, key="tarjetas_alcance"
+    )
+    formato_tarjetas = col_formato.radio("Formato", ["PDF", "PNG"], horizontal=True, key="tarjetas_formato")
+    pedidos_tarjetas = pedidos if alcance_tarjetas == "Los del menú" else pedidos_catalogo(datos)
+
+    def archivo_tarjetas():
+        return b"".join(zip_tarjetas(pedidos_tarjetas, unidad, formato_tarjetas))
+
+    st.download_button(
+        f"Descargar {len(pedidos_tarjetas)} tarjeta(s)",
+        data=archivo_tarjetas,
+        file_name="tarjetas.zip",
+        mime="application/zip",
+        disabled=not pedidos_tarjetas,
+        on_click="ignore",
+        icon="🖨️"
+    )
+    terminar_rerun(detener=True)
+
+# === ¿Qué puedo preparar? ===
+medicion.marca("despensa")
+if modo == "¿Qué puedo preparar?":
+    st.markdown("<h3 style='font-size: 48px; color: #e63118; font-weight: bold;'>¿Qué puedo preparar?</h3>", unsafe_allow_html=True)
+
+    inventario = st.multiselect(
+        "Ingredientes que tienes en casa",
+        datos.despensa.ingredientes,
+        key="despensa",
+        placeholder="Ej: Gin, Vermouth Rosso, Campari"
+    )
+    st.caption("Los ingredientes \"a gusto\" (sal, pimienta, canela...) no se exigen. Se respetan los filtros de la barra lateral.")
 
-# Mostrar imagen si existe (nombre del archivo debe coincidir con el cóctel)
-from PIL import Image
-import os
-image_path = f"imagenes/{coctel_sel}.jpg"
-if os.path.exists(image_path):
-    st.image(image_path, width=400)
-else:
-    st.info("Imagen no disponible para este cóctel.") # Opcional: st.image("images/default.jpg", width=400)
+    if not inventario:
+        st.info("Elige los ingredientes que tienes para ver qué cócteles puedes preparar.")
+        terminar_rerun(detener=True)
 
-# === Sección de ingredientes ===
+    # Cócteles a los que les faltan 0, 1 o 2 ingredientes (ver despensa.py)
+    grupos = {0: [], 1: [], 2: []}
+    for coctel, faltan in datos.despensa.sugerencias(inventario, mascara=mascara_final):
+        grupos[len(faltan)].append((coctel, faltan))
 
-st.markdown("### Ingredientes")
-
-for ing in ingredientes_ajustados.index:
-    val_ajustado = ingredientes_ajustados[ing]
-    val_base_ml = ingredientes_escalados_ml[ing]
-
-    # Ingredientes que se agregan a gusto
-    if ing in ingredientes_a_gusto:
-        st.write(f"- Agregar {ingredientes_a_gusto[ing]} a gusto")
-
-    # Ingredientes que se agregan en gotas
-    elif ing in ingredientes_gotas:
-        st.write(f"- Algunas gotas de {ingredientes_gotas[ing]}")
-    
-    # Ingredientes que se agregan en unidades
-    elif ing in ingredientes_unidades:
-        cantidad_u = int(round(val_ajustado))
-        nombre_u = ingredientes_unidades[ing]
-        st.write(f"- {cantidad_u} {nombre_u}")
-    
-    # Ingredientes que se agregan en cucharaditas
-    elif ing in ingredientes_cucharaditas:
-        cantidad_c = int(round(val_ajustado))
-        nombre_c = ingredientes_cucharaditas[ing]
-        st.write(f"- {cantidad_c} cucharadita(s) de {nombre_c}")
-
-    # Ingredientes que se agregan en cucharadas
-    elif ing in ingredientes_cucharadas:
-        cantidad_c2 = int(round(val_ajustado))
-        nombre_c2 = ingredientes_cucharadas[ing]
-        st.write(f"- {cantidad_c2} cucharada(s) de {nombre_c2}")
-    
-    # Ingredientes que se agregan en tazas
-    elif ing in ingredientes_tazas:
-        cantidad_c3 = int(round(val_ajustado))
-        nombre_c3 = ingredientes_tazas[ing]
-        st.write(f"- {cantidad_c3} taza(s) de {nombre_c3}")
-
-    # Ingredientes que se agregan en gramos
-    elif ing in ingredientes_gramos:
-        cantidad_g = int(round(val_ajustado))
-        nombre_g = ingredientes_gramos[ing]
-        st.write(f"- {cantidad_g} g de {nombre_g}")
-
-    # Ingredientes con cantidad específica
-    else:
-        if unidad == "ml":
-            cantidad = int(round(val_ajustado))  # Redondea a entero para evitar decimales innecesarios
-        else:  # onzas
-            cantidad = round(val_ajustado, 2)
-            if cantidad.is_integer():
-                cantidad = int(cantidad)  # Muestra como 1 en lugar de 1.0 si es entero
+    for faltan, titulo in [(0, "Puedes preparar"), (1, "Te falta 1 ingrediente"), (2, "Te faltan 2 ingredientes")]:
+        if grupos[faltan]:
+            st.markdown(f"### {titulo}")
+            for coctel, ingredientes in grupos[faltan]:
+                st.write(f"- **{coctel}**" + (f" (falta: {', '.join(ingredientes)})" if ingredientes else ""))
 
-        st.write(f"- {cantidad} {unidad} de {ing}")
+    if not any(grupos.values()):
+        st.info("Con estos ingredientes todavía no alcanza para ningún cóctel. ¡Prueba agregando algunos más!")
+    terminar_rerun(detener=True)
 
-# === Sección de información para la preparación (si hay) ===
-recurso_fila = recursos[recursos["coctel"] == coctel_sel]
+# === Visualización central ===
 
-if not recurso_fila.empty:
-    fila = recurso_fila.iloc[0]
-    
-    # Mostrar preparación (si existe)
-    if pd.notna(fila.get("preparacion")):
-        st.markdown("### Preparación")
-        st.markdown(f"🥄 {fila['preparacion']}")
+# Contenido del cóctel que no depende de la cantidad (ver detalle.py):
+# se arma una vez por cóctel y se reutiliza en los reruns siguientes
+medicion.marca("vista/detalle")
+info = detalle(datos, coctel_sel)
 
-# === Sección de jarabes utilizados (si hay) ===
+with cabecera:
+    st.markdown(f"<h3 style='font-size: 48px; color: #e63118; font-weight: bold;'>{coctel_sel}</h3>", unsafe_allow_html=True)
 
-jarabes_columnas = [
-    "Jarabe Simple", "Jarabe de Canela", "Jarabe de Jengibre",
-    "Jarabe de Menta", "Jarabe de Cedrón", "Jarabe de Romero", 
-    "Jarabe de Jamaica", "Jarabe de Miel", "Jarabe de Frambuesa",
-    "Jarabe de Butterfly Pea y Jengibre"
-]
+    # Mostrar imagen si existe (nombre del archivo debe coincidir con el cóctel)
+    medicion.marca("vista/imagen")
+    if info.imagen:
+        # Se envía una versión reducida y recomprimida, no el original
+        st.image(derivada(info.imagen, "tarjeta"), width=400)
+    else:
+        st.info("Imagen no disponible para este cóctel.") # Opcional: st.image("images/default.jpg", width=400)
+
+# === Sección de ingredientes ===
+# La dibuja el fragmento `cantidades`, debajo de la cabecera
 
-# Revisa si alguno de los jarabes tiene un valor mayor a 0
-jarabes_presentes = [j for j in jarabes_columnas if j in ingredientes.index and ingredientes[j] > 0]
+# === Sección de información para la preparación (si hay) ===
+medicion.marca("vista/preparación")
+if info.preparacion is not None:
+    st.markdown("### Preparación")
+    st.markdown(f"🥄 {info.preparacion}")
 
-if jarabes_presentes:
-    #st.subheader("Jarabe")
-    for j in jarabes_presentes:
-        fila_jarabe = jarabes[jarabes["jarabe"] == j]
-        if not fila_jarabe.empty:
-            st.markdown(f"**💡 {j}**")
-            st.write(fila_jarabe["preparación"].values[0])
+# === Sección de jarabes utilizados (si hay) ===
+for jarabe, preparacion in info.jarabes:
+    st.markdown(f"**💡 {jarabe}**")
+    st.write(preparacion)
 
 # === Técnica de preparación ===
+medicion.marca("vista/técnica y servicio")
 st.markdown("### Técnica")
-st.write(f"🛠️ **{tecnica_info['nombre_español']} ({fila_receta['tecnica']})** – {tecnica_info['descripción']}")
+st.write(info.tecnica)
 
 # === Información sobre el hielo ===
-hielo = fila_receta["hielo"]
-if pd.notna(hielo) and str(hielo).strip().lower() in ["Sí", "Si", "sí", "si"]:
-    st.markdown("### Hielo")
+st.markdown("### Hielo")
+if info.con_hielo:
     st.write("❄️ Servir con hielo.")
 else:
-    st.markdown("### Hielo")
     st.write("🚫 Servir sin hielo.")
 
 # === Cristalería sugerida ===
 st.markdown("### Cristalería sugerida")
-st.write(f"🥂 {fila_receta['vaso']} – {int(fila_receta['capacidad_vaso_sin_hielo'])} ml")
+st.write(info.cristaleria)
 
 # === Decoración sugerida (complementos con valor 1) ===
-fila_complementos = complementos[complementos["coctel"] == coctel_sel]
-if not fila_complementos.empty:
-    decoraciones = fila_complementos.iloc[0].drop("coctel")
-    decoraciones = decoraciones[decoraciones == 1].index.tolist()
-    
-    if decoraciones:
-        st.markdown("### Garnitura (garnish)")
-        st.write("🍋‍🟩 Acompañar con: " + ", ".join(decoraciones))
+if info.garnitura:
+    st.markdown("### Garnitura (garnish)")
+    st.write("🍋‍🟩 Acompañar con: " + ", ".join(info.garnitura))
 
 # === Sección recursos asociados (si existen) ===
 
-if not recurso_fila.empty:
-    fila = recurso_fila.iloc[0]
-    
-    # Mostrar observaciones (si existen)
-    if pd.notna(fila.get("observaciones")):
-        st.markdown("### Observaciones")
-        st.markdown(f"📝 {fila['observaciones']}")
-
-    # Verificar si hay al menos un recurso adicional
-    hay_recursos = any([
-        pd.notna(fila.get("recurso")),
-        pd.notna(fila.get("texto_enlace_musica")) and pd.notna(fila.get("url_musica")),
-        pd.notna(fila.get("texto_enlace_otro")) and pd.notna(fila.get("url_otro")),
-        pd.notna(fila.get("texto_enlace_musica_2")) and pd.notna(fila.get("url_musica_2")),
-        pd.notna(fila.get("imagen")),
-    ])
-
-    if hay_recursos:
-        st.markdown("---")
-        st.markdown(
-            "<h2 style='color: #e63118; font-size: 36px; font-weight: bold;'>Recursos adicionales</h2>",
-            unsafe_allow_html=True
+# Mostrar observaciones (si existen)
+medicion.marca("vista/observaciones")
+if info.observaciones is not None:
+    st.markdown("### Observaciones")
+    st.markdown(f"📝 {info.observaciones}")
+
+# === Cócteles similares (precalculados al cargar los datos, ver similares.py) ===
+medicion.marca("vista/similares")
+
+
+# Ir a otro cóctel; si no está entre los filtrados se limpian los filtros.
+# El selector se vuelve a crear con el cóctel pedido como valor inicial
+def ir_a_coctel(coctel):
+    if coctel not in cocteles:
+        for clave in ("palabra_clave_input", "licor_sel"):
+            st.session_state.pop(clave, None)
+    st.session_state.pop("coctel_sel", None)
+    st.session_state.coctel_destino = coctel
+
+
+if info.similares:
+    st.markdown("### Cócteles similares")
+    for columna, (similar, similitud) in zip(st.columns(len(info.similares)), info.similares):
+        columna.button(
+            similar,
+            key=f"similar_{similar}",
+            on_click=ir_a_coctel,
+            args=(similar,),
+            help=f"Similitud: {similitud:.0%}",
+            width="stretch"
         )
-        
-        # === Mostrar IMAGEN Y CRÉDITOS ===
-        if pd.notna(fila.get("imagen")):
-            lineas = [l.strip() for l in fila["imagen"].split("\n") if l.strip()]
-
-            # 1) Primera línea: nombre del archivo
-            archivo_imagen = lineas[0] if len(lineas) > 0 else ""
-
-            # 2) El texto (si lo hubiera)
-            contenido = "\n".join(lineas[1:]) if len(lineas) > 1 else ""
-
-            # Ruta completa
-            image_path = f"imagenes/{archivo_imagen}"
-
-            # Mostrar imagen desde carpeta local
-            if os.path.exists(image_path):
-                st.image(image_path, width="stretch")
-            else:
-                st.warning(f"Imagen no encontrada: {archivo_imagen}")
-
-            # Mostrar texto si existe(opcional)
-            if contenido:
-                st.text(contenido)
-                
-       # Mostrar recurso largo (como poema o relato)
-        if pd.notna(fila.get("recurso")):
-            lineas = fila["recurso"].strip().split("\n")
-            titulo = lineas[0] if lineas else "Recurso"
-            contenido = "\n".join(lineas[1:]).strip()
-            st.markdown(f"### {titulo}")
-            st.text(contenido)
 
-        # Mostrar otro enlace adicional (si existe)
-        if pd.notna(fila.get("texto_enlace_otro")) and pd.notna(fila.get("url_otro")):
-            st.markdown("### Déjate Sorprender")
-            st.markdown(f'<a href="{fila["url_otro"]}" target="_blank">📼 {fila["texto_enlace_otro"]}</a>', unsafe_allow_html=True)
-
-        # Mostrar enlace musical (si existe)
-        if pd.notna(fila.get("texto_enlace_musica")) and pd.notna(fila.get("url_musica")):
-            st.markdown("### Vamos a ponerte un tema")
+medicion.marca("vista/recursos")
+
+# Los recursos (imagen grande, relato o poema, música) no se envían con la
+# página: se cargan recién cuando el usuario los abre. Es un fragmento, así
+# que abrirlos solo vuelve a ejecutar esta sección y no toda la app. El
+# interruptor es propio de cada cóctel: abrir los de uno no carga los de los
+# siguientes
+@st.fragment
+def mostrar_recursos(coctel, recursos_coctel):
+    contenido = []
+    if recursos_coctel.imagen is not None:
+        contenido.append("🖼️ imagen")
+    if recursos_coctel.titulo is not None:
+        contenido.append(f"📖 {recursos_coctel.titulo.strip()}")
+    if recursos_coctel.enlace_otro or recursos_coctel.musica or recursos_coctel.musica_2:
+        contenido.append("📀 enlaces")
+
+    if not st.toggle("Mostrar recursos adicionales", key=f"ver_recursos:{coctel}"):
+        if contenido:
+            st.caption(" · ".join(contenido))
+        return
+
+    # === Mostrar IMAGEN Y CRÉDITOS ===
+    if recursos_coctel.imagen is not None:
+        # Mostrar imagen desde carpeta local (derivada JPEG progresiva)
+        if recursos_coctel.imagen_ruta:
+            st.image(derivada(recursos_coctel.imagen_ruta, "recurso"), width="stretch")
+        else:
+            st.warning(f"Imagen no encontrada: {recursos_coctel.imagen}")
+
+        # Mostrar texto si existe(opcional)
+        if recursos_coctel.imagen_texto:
+            st.text(recursos_coctel.imagen_texto)
+
+    # Mostrar recurso largo (como poema o relato)
+    if recursos_coctel.titulo is not None:
+        st.markdown(f"### {recursos_coctel.titulo}")
+        st.text(recursos_coctel.contenido)
+
+    # Mostrar otro enlace adicional (si existe)
+    if recursos_coctel.enlace_otro:
+        url, texto = recursos_coctel.enlace_otro
+        st.markdown("### Déjate Sorprender")
+        st.markdown(f'<a href="{url}" target="_blank">📼 {texto}</a>', unsafe_allow_html=True)
+
+    # Mostrar enlaces musicales (si existen) y la explicación de cada uno
+    for titulo_musica, musica in [
+        ("Vamos a ponerte un tema", recursos_coctel.musica),
+        ("Vamos a ponerte otro tema", recursos_coctel.musica_2),
+    ]:
+        if musica:
+            url, texto, cita = musica
+            st.markdown(f"### {titulo_musica}")
             st.markdown(
-                f'<a href="{fila["url_musica"]}" target="_blank">📀 {fila["texto_enlace_musica"]}</a>',
+                f'<a href="{url}" target="_blank">📀 {texto}</a>',
                 unsafe_allow_html=True
             )
 
-            # Mostrar explicación si existe
-            if pd.notna(fila.get("cita_letra")):
+            if cita is not None:
                 st.markdown(
-                    f'>La canción se seleccionó porque este verso lo pide:\n>\n> *{fila["cita_letra"]}*'
+                    f'>La canción se seleccionó porque este verso lo pide:\n>\n> *{cita}*'
                 )
 
-        # Mostrar otro enlace musical (si existe)
-        if pd.notna(fila.get("texto_enlace_musica_2")) and pd.notna(fila.get("url_musica_2")):
-            st.markdown("### Vamos a ponerte otro tema")
-            st.markdown(
-                f'<a href="{fila["url_musica_2"]}" target="_blank">📀 {fila["texto_enlace_musica_2"]}</a>',
-                unsafe_allow_html=True
-            )
 
-            # Mostrar explicación si existe
-            if pd.notna(fila.get("cita_letra_2")):
-                st.markdown(
-                    f'>La canción se seleccionó porque este verso lo pide:\n>\n> *{fila["cita_letra_2"]}*'
-                )
+recursos_coctel = info.recursos
+if recursos_coctel:
+    st.markdown("---")
+    st.markdown(
+        "<h2 style='color: #e63118; font-size: 36px; font-weight: bold;'>Recursos adicionales</h2>",
+        unsafe_allow_html=True
+    )
+    mostrar_recursos(coctel_sel, recursos_coctel)
 
 
+medicion.marca("pie")
 st.markdown(
 """
 <hr style="margin-top:40px;margin-bottom:10px">
@@ -694,4 +719,5 @@ st.markdown(
 """,
 unsafe_allow_html=True
 )
-        
\ No newline at end of file
+
+terminar_rerun()
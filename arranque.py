@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import filtros
+from datos import cargar_datos
+from detalle import detalle
+from imagenes import derivada, manifiesto
+from metricas import Medicion
+
+# === Precalentamiento al arrancar ===
+
+# Antes de aceptar conexiones (ver servidor.py y el lifespan de api.py) se
+# carga el libro, se lee imagenes/ una sola vez, se cruza con el libro y se
+# dejan listas las derivadas y los detalles. Así los problemas de imágenes se
+# ven en el log del despliegue y no como st.warning frente a un usuario, y el
+# primer usuario no paga los caches en frío. Desde la consola:
+#   python arranque.py [--estricto]   (--estricto: sale con 1 si hay problemas)
+
+log = logging.getLogger("arranque")
+
+# Archivos de imagenes/ que usa la app pero no corresponden a ningún cóctel
+ARCHIVOS_DE_LA_APP = {"favicon.ico", "icon.png"}
+
+
+# Cruza el manifiesto con el libro: imágenes que faltan, que no se pueden
+# abrir o que no usa ningún cóctel. Devuelve (problemas, derivadas a generar).
+# Con `cocteles` se revisan solo esos (y no se buscan imágenes sin usar)
+def validar_imagenes(datos, archivos, cocteles=None):
+    problemas = []
+    derivadas = []
+    usadas = set(ARCHIVOS_DE_LA_APP)
+
+    def usar(nombre, variante, problema):
+        usadas.add(nombre)
+        archivo = archivos.get(nombre)
+        if archivo is None:
+            problemas.append(problema)
+        elif archivo.ancho is not None:
+            derivadas.append((archivo.ruta, variante))
+
+    todos = cocteles is None
+    if todos:
+        cocteles = filtros.cocteles(datos, filtros.todos(datos))
+
+    for coctel in cocteles:
+        usar(f"{coctel}.jpg", "tarjeta", f"imagenes: '{coctel}' no tiene foto ({coctel}.jpg)")
+        recursos = detalle(datos, coctel).recursos
+        if recursos is not None and recursos.imagen is not None:
+            usar(
+                recursos.imagen, "recurso",
+                f"recurso: '{coctel}' usa la imagen '{recursos.imagen}', que no está en imagenes/",
+            )
+
+    if not todos:
+        return problemas, derivadas
+
+    for nombre, archivo in archivos.items():
+        if archivo.ancho is None and nombre not in ARCHIVOS_DE_LA_APP:
+            problemas.append(f"imagenes: '{nombre}' no se puede abrir como imagen")
+        elif nombre not in usadas:
+            problemas.append(f"imagenes: '{nombre}' no lo usa ningún cóctel")
+
+    return problemas, derivadas
+
+
+def _generar_derivadas(derivadas, hilos=None):
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        list(pool.map(lambda d: derivada(*d), derivadas))
+
+
+def precalentar(hilos=None):
+    medicion = Medicion("arranque")
+
+    medicion.marca("datos")
+    datos = cargar_datos()
+
+    medicion.marca("manifiesto")
+    archivos = manifiesto()
+
+    # Validar también calcula el detalle de cada cóctel (queda en su cache)
+    medicion.marca("validacion")
+    problemas, derivadas = validar_imagenes(datos, archivos)
+    for problema in problemas:
+        log.warning(problema)
+
+    medicion.marca("derivadas")
+    _generar_derivadas(derivadas, hilos)
+
+    medicion.cerrar()
+    log.info(
+        "%d imágenes, %d derivadas y %d problema(s) en %.2f s",
+        len(archivos), len(derivadas), len(problemas), medicion.total,
+    )
+    return problemas
+
+
+# Lo mismo, pero solo para algunos cócteles (los que cambiaron al recargar el
+# libro, ver recarga.py)
+def precalentar_cocteles(datos, cocteles, hilos=None):
+    problemas, derivadas = validar_imagenes(datos, manifiesto(), cocteles)
+    for problema in problemas:
+        log.warning(problema)
+    _generar_derivadas(derivadas, hilos)
+    return problemas
+
+
+# Lifespan de los servidores (servidor.py y api.py): cada proceso precalienta
+# los datos antes de aceptar conexiones y vigila el libro para recargarlo en
+# caliente (ver recarga.py)
+@asynccontextmanager
+async def ciclo_de_vida(app):
+    import recarga  # recarga.py importa este módulo
+
+    await asyncio.to_thread(precalentar)
+    vigilante = recarga.iniciar()
+    yield
+    vigilante.detener()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    problemas = precalentar()
+    sys.exit(1 if problemas and "--estricto" in sys.argv[1:] else 0)
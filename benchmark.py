@@ -0,0 +1,393 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import socket
+import subprocess
+import sys
+import time
+import tracemalloc
+import urllib.request
+from datetime import datetime
+
+import numpy as np
+
+import datos as modulo_datos
+import detalle as modulo_detalle
+import imagenes as modulo_imagenes
+
+# === Benchmark del rerun de Streamlit ===
+
+# Mide la app como la ve un usuario: cada interacción es un rerun completo de
+# app.py. Los escenarios corren con AppTest (en el mismo proceso) y la prueba
+# de carga abre sesiones reales contra un servidor local.
+#
+#   python benchmark.py                          # escenarios + carga
+#   python benchmark.py --sin-carga              # solo escenarios
+#   python benchmark.py --comparar base.json     # falla si hay regresión
+#
+# El resultado queda en JSON (.cache/benchmark.json, o --salida) para
+# compararlo entre versiones antes de publicar.
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+PERCENTILES = (50, 90, 95, 99)
+
+# Palabras y licores que se recorren en los escenarios de filtro
+PALABRAS = ["limón", "menta", "jengibre", "naranja", "café", "gin", ""]
+LICORES = ["Gin", "Ron", "Pisco", "Vodka", "Tequila", "Sin Alcohol", "Todos"]
+
+# Un escenario es más lento que la base si su p50 o p95 crece más que esto
+TOLERANCIA = 1.25
+
+SEMILLA = 2025
+
+
+# === Estadísticas ===
+
+def resumen(tiempos):
+    ms = np.asarray(tiempos, dtype=float) * 1000
+    datos = {"n": len(ms), "media_ms": round(float(ms.mean()), 2), "max_ms": round(float(ms.max()), 2)}
+    for p in PERCENTILES:
+        datos[f"p{p}_ms"] = round(float(np.percentile(ms, p)), 2)
+    return datos
+
+
+def _rss_maximo_mb():
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KiB; macOS, bytes
+    return round(maximo / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+# Vacía todo lo que la app guarda en memoria del proceso, como si recién
+# se hubiera levantado el servidor (el pickle compilado en .cache se conserva)
+def limpiar_caches():
+    modulo_datos._memo.clear()
+    modulo_detalle.invalidar()
+    modulo_imagenes._memo.clear()
+    modulo_imagenes.en_linea.cache_clear()
+
+
+# === Escenarios con AppTest ===
+
+def _app():
+    from streamlit.testing.v1 import AppTest
+    return AppTest.from_file(APP, default_timeout=120)
+
+
+def _medir(at, accion):
+    accion(at)
+    inicio = time.perf_counter()
+    at.run()
+    transcurrido = time.perf_counter() - inicio
+    if at.exception:
+        raise RuntimeError(f"La app falló: {at.exception[0].value}")
+    return transcurrido
+
+
+def _ciclo(valores):
+    i = -1
+
+    def siguiente():
+        nonlocal i
+        i = (i + 1) % len(valores)
+        return valores[i]
+    return siguiente
+
+
+# Cada escenario recibe una AppTest ya ejecutada una vez y devuelve la
+# función que prepara la siguiente interacción
+def _busqueda(at):
+    palabra = _ciclo(PALABRAS)
+    return lambda at: at.sidebar.text_input(key="palabra_clave_input").set_value(palabra())
+
+
+def _cambio_licor(at):
+    licor = _ciclo([l for l in LICORES if l in at.sidebar.selectbox(key="licor_sel").options])
+    return lambda at: at.sidebar.selectbox(key="licor_sel").set_value(licor())
+
+
+def _cambio_coctel(at):
+    azar = random.Random(SEMILLA)
+    opciones = list(at.sidebar.selectbox(key="coctel_sel").options)
+    return lambda at: at.sidebar.selectbox(key="coctel_sel").set_value(azar.choice(opciones))
+
+
+def _modo_litros(at):
+    at.sidebar.radio(key="modo_forzado").set_value("Volumen total (litros)").run()
+    litros = _ciclo([0.5, 1.0, 2.5, 5.0, 10.0])
+    return lambda at: at.sidebar.selectbox(key="litros").set_value(litros())
+
+
+def _limpiar(at):
+    def accion(at):
+        # Se ensucia la sesión antes de cada limpieza
+        at.sidebar.text_input(key="palabra_clave_input").set_value("gin").run()
+        at.sidebar.radio(key="modo_forzado").set_value("Volumen total (litros)").run()
+        next(b for b in at.sidebar.button if b.label == "Limpiar selección").click()
+    return accion
+
+
+ESCENARIOS = {
+    "busqueda": _busqueda,
+    "cambio_licor": _cambio_licor,
+    "cambio_coctel": _cambio_coctel,
+    "modo_litros": _modo_litros,
+    "limpiar_seleccion": _limpiar,
+}
+
+
+def arranque_en_frio(repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        limpiar_caches()
+        tiempos.append(_medir(_app(), lambda at: None))
+    return tiempos
+
+
+def escenario(nombre, repeticiones):
+    at = _app().run()
+    accion = ESCENARIOS[nombre](at)
+    return [_medir(at, accion) for _ in range(repeticiones)]
+
+
+# Pico de memoria de Python (tracemalloc) de unas pocas iteraciones; se mide
+# aparte porque tracemalloc hace más lentos los reruns
+def pico_memoria(nombre, repeticiones=3):
+    tracemalloc.start()
+    try:
+        if nombre == "arranque_en_frio":
+            arranque_en_frio(repeticiones)
+        else:
+            escenario(nombre, repeticiones)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(pico / (1 << 20), 1)
+
+
+def medir_escenarios(repeticiones):
+    resultados = {}
+    for nombre in ["arranque_en_frio", *ESCENARIOS]:
+        if nombre == "arranque_en_frio":
+            tiempos = arranque_en_frio(max(1, repeticiones // 4))
+        else:
+            tiempos = escenario(nombre, repeticiones)
+        resultados[nombre] = {**resumen(tiempos), "pico_python_mb": pico_memoria(nombre)}
+        print(f"  {nombre:<18} p50 {resultados[nombre]['p50_ms']:>8} ms   p95 {resultados[nombre]['p95_ms']:>8} ms")
+    return resultados
+
+
+# === Prueba de carga contra un servidor local ===
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _esperar_servidor(puerto, proceso, espera=60):
+    limite = time.monotonic() + espera
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError("El servidor de Streamlit terminó al arrancar")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{puerto}/_stcore/health", timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("El servidor de Streamlit no respondió a tiempo")
+
+
+def _rss_proceso_mb(pid):
+    # Pico de memoria residente del servidor (solo Linux)
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for linea in f:
+                if linea.startswith("VmHWM:"):
+                    return round(int(linea.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+# Una sesión del navegador: se conecta, pide el primer run y luego cambia de
+# cóctel `reruns` veces. Devuelve la latencia de cada rerun.
+async def _sesion(url, reruns, azar):
+    import websockets
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None, origin=url.replace("ws", "http", 1)) as ws:
+        selector = None
+
+        async def rerun(estados=()):
+            nonlocal selector
+            mensaje = BackMsg()
+            mensaje.rerun_script.query_string = ""
+            mensaje.rerun_script.widget_states.widgets.extend(estados)
+            inicio = time.perf_counter()
+            await ws.send(mensaje.SerializeToString())
+            while True:
+                respuesta = ForwardMsg()
+                respuesta.ParseFromString(await ws.recv())
+                tipo = respuesta.WhichOneof("type")
+                if tipo == "delta" and respuesta.delta.WhichOneof("type") == "new_element":
+                    elemento = respuesta.delta.new_element
+                    if elemento.WhichOneof("type") == "selectbox" and elemento.selectbox.label == "Selecciona un cóctel":
+                        selector = elemento.selectbox
+                elif tipo == "script_finished":
+                    return time.perf_counter() - inicio
+
+        tiempos = [await rerun()]
+        for _ in range(reruns):
+            if selector is None:
+                tiempos.append(await rerun())
+                continue
+            estado = WidgetState(id=selector.id, string_value=azar.choice(list(selector.options)))
+            tiempos.append(await rerun([estado]))
+        return tiempos
+
+
+async def _sesiones(url, sesiones, reruns):
+    tareas = [_sesion(url, reruns, random.Random(SEMILLA + i)) for i in range(sesiones)]
+    return await asyncio.gather(*tareas)
+
+
+def prueba_de_carga(sesiones, reruns):
+    puerto = _puerto_libre()
+    proceso = subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", APP,
+            "--server.port", str(puerto), "--server.headless", "true",
+            "--browser.gatherUsageStats", "false",
+        ],
+        cwd=os.path.dirname(APP),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _esperar_servidor(puerto, proceso)
+        url = f"ws://127.0.0.1:{puerto}/_stcore/stream"
+
+        # Una sesión de calentamiento para no medir la carga del libro
+        asyncio.run(_sesiones(url, 1, 1))
+
+        inicio = time.perf_counter()
+        por_sesion = asyncio.run(_sesiones(url, sesiones, reruns))
+        total = time.perf_counter() - inicio
+
+        primeros = [t[0] for t in por_sesion]
+        siguientes = [x for t in por_sesion for x in t[1:]]
+        return {
+            "sesiones": sesiones,
+            "reruns_por_sesion": reruns,
+            "duracion_s": round(total, 2),
+            "reruns_por_segundo": round(sum(len(t) for t in por_sesion) / total, 1),
+            "primer_run": resumen(primeros),
+            "rerun": resumen(siguientes) if siguientes else None,
+            "rss_servidor_mb": _rss_proceso_mb(proceso.pid),
+        }
+    finally:
+        proceso.terminate()
+        try:
+            proceso.wait(10)
+        except subprocess.TimeoutExpired:
+            proceso.kill()
+
+
+# === Resultados ===
+
+def _version(paquete):
+    try:
+        from importlib.metadata import version
+        return version(paquete)
+    except Exception:
+        return None
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(APP),
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def entorno():
+    return {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "streamlit": _version("streamlit"),
+        "pandas": _version("pandas"),
+        "numpy": _version("numpy"),
+    }
+
+
+# Escenarios cuyo p50 o p95 empeoró más que la tolerancia respecto de la base
+def regresiones(actual, base, tolerancia=TOLERANCIA):
+    encontradas = []
+    for nombre, medido in actual.get("escenarios", {}).items():
+        anterior = base.get("escenarios", {}).get(nombre)
+        if anterior is None:
+            continue
+        for clave in ("p50_ms", "p95_ms"):
+            if anterior[clave] > 0 and medido[clave] > anterior[clave] * tolerancia:
+                encontradas.append(f"{nombre} {clave}: {anterior[clave]} -> {medido[clave]}")
+    return encontradas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de los reruns de app.py")
+    parser.add_argument("--repeticiones", type=int, default=20, help="reruns medidos por escenario")
+    parser.add_argument("--sesiones", type=int, default=20, help="sesiones simultáneas en la prueba de carga")
+    parser.add_argument("--reruns", type=int, default=10, help="reruns por sesión en la prueba de carga")
+    parser.add_argument("--sin-carga", action="store_true", help="omitir la prueba de carga")
+    parser.add_argument(
+        "--salida", default=os.path.join(modulo_datos.DIRECTORIO_CACHE, "benchmark.json"),
+        help="archivo JSON de resultados (por defecto en .cache/, fuera de git)",
+    )
+    parser.add_argument("--comparar", help="JSON de una corrida anterior; termina con error si hay regresión")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+    args = parser.parse_args(argv)
+
+    os.chdir(os.path.dirname(APP))
+    resultado = {"entorno": entorno()}
+
+    print("Escenarios (AppTest):")
+    resultado["escenarios"] = medir_escenarios(args.repeticiones)
+
+    if not args.sin_carga:
+        print(f"Carga: {args.sesiones} sesiones × {args.reruns} reruns")
+        resultado["carga"] = prueba_de_carga(args.sesiones, args.reruns)
+        carga = resultado["carga"]
+        print(f"  {carga['reruns_por_segundo']} reruns/s, p95 {carga['rerun']['p95_ms'] if carga['rerun'] else '-'} ms")
+
+    resultado["rss_maximo_mb"] = _rss_maximo_mb()
+
+    os.makedirs(os.path.dirname(args.salida) or ".", exist_ok=True)
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"Resultados en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        encontradas = regresiones(resultado, base, args.tolerancia)
+        for r in encontradas:
+            print(f"REGRESIÓN {r}")
+        return 1 if encontradas else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+import re
+import unicodedata
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+
+# === Normalización de texto ===
+
+_PALABRA = re.compile(r"\w+")
+
+
+# Minúsculas y sin tildes: "Limón" -> "limon", "Curaçao" -> "curacao"
+def normalizar(texto):
+    descompuesto = unicodedata.normalize("NFKD", str(texto).lower())
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def tokenizar(texto):
+    return _PALABRA.findall(normalizar(texto))
+
+
+# === Relevancia ===
+
+# Peso de cada campo: una coincidencia en el nombre del cóctel vale más que
+# en sus ingredientes, y estos más que en los textos (preparación, recursos)
+PESOS = {"nombre": 3, "ingrediente": 2, "texto": 1}
+
+# Calidad de la coincidencia de un término con un token del vocabulario
+EXACTA = 1.0      # "gin" -> "gin"
+PREFIJO = 0.9     # "jengi" -> "jengibre"
+CONTENIDA = 0.7   # "limon" -> "limonada", "jugodelimon"
+APROXIMADA = 0.5  # "jenjibre" -> "jengibre" (por cada error se resta 0.1)
+
+# Términos más cortos no se buscan con errores (habría demasiado ruido)
+LARGO_MINIMO_APROXIMADO = 4
+
+
+# Errores tolerados según el largo del término
+def errores_tolerados(termino):
+    if len(termino) < LARGO_MINIMO_APROXIMADO:
+        return 0
+    return 1 if len(termino) <= 7 else 2
+
+
+def _trigramas(token):
+    relleno = f"$${token}$"
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+# Distancia de edición con transposiciones (Damerau, versión OSA), cortando
+# en cuanto supera `maximo`
+def distancia(a, b, maximo):
+    if abs(len(a) - len(b)) > maximo:
+        return maximo + 1
+    anterior2 = None
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        actual = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            costo = ca != cb
+            actual[j] = min(anterior[j] + 1, actual[j - 1] + 1, anterior[j - 1] + costo)
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                actual[j] = min(actual[j], anterior2[j - 2] + 1)
+        if min(actual) > maximo:
+            return maximo + 1
+        anterior2, anterior = anterior, actual
+    return anterior[-1]
+
+
+# === Índice invertido ===
+
+class IndiceBusqueda:
+    # documentos: tuplas (coctel, texto, campo), con campo una clave de PESOS;
+    # un cóctel puede aparecer en varios
+    def __init__(self, documentos):
+        pesos_por_token = {}
+        for coctel, texto, campo in documentos:
+            peso = PESOS[campo]
+            for token in tokenizar(texto):
+                pesos = pesos_por_token.setdefault(token, {})
+                pesos[coctel] = max(pesos.get(coctel, 0), peso)
+
+        self.tokens = sorted(pesos_por_token)
+        self.pesos = [pesos_por_token[t] for t in self.tokens]  # {coctel: peso}
+        self.cocteles = [frozenset(p) for p in self.pesos]
+
+        # Todos los sufijos del vocabulario, ordenados: una búsqueda por prefijo
+        # sobre los sufijos equivale a buscar la palabra dentro de cada token
+        sufijos = sorted(
+            (token[i:], id_token)
+            for id_token, token in enumerate(self.tokens)
+            for i in range(len(token))
+        )
+        self._sufijos = [s for s, _ in sufijos]
+        self._sufijo_token = [t for _, t in sufijos]
+
+        # Trigramas -> tokens, para encontrar candidatos con errores de tipeo
+        self._por_trigrama = {}
+        for id_token, token in enumerate(self.tokens):
+            for trigrama in _trigramas(token):
+                self._por_trigrama.setdefault(trigrama, []).append(id_token)
+
+    # Ids de los tokens del vocabulario que contienen el término
+    def _tokens_con(self, termino):
+        ids = set()
+        i = bisect_left(self._sufijos, termino)
+        while i < len(self._sufijos) and self._sufijos[i].startswith(termino):
+            ids.add(self._sufijo_token[i])
+            i += 1
+        return ids
+
+    # Tokens a pocos errores del término: {id: errores}. Cada error cambia a
+    # lo más 3 trigramas, así que solo se comparan los tokens que comparten
+    # suficientes trigramas con el término
+    def _tokens_parecidos(self, termino):
+        maximo = errores_tolerados(termino)
+        if not maximo:
+            return {}
+        trigramas = _trigramas(termino)
+        compartidos = {}
+        for trigrama in trigramas:
+            for id_token in self._por_trigrama.get(trigrama, ()):
+                compartidos[id_token] = compartidos.get(id_token, 0) + 1
+
+        minimo = max(1, len(trigramas) - 3 * maximo)
+        parecidos = {}
+        for id_token, n in compartidos.items():
+            if n >= minimo:
+                errores = distancia(termino, self.tokens[id_token], maximo)
+                if errores <= maximo:
+                    parecidos[id_token] = errores
+        return parecidos
+
+    # Coincidencias de un término: {id_token: calidad}. Los errores de tipeo
+    # solo se consideran si el término no aparece tal cual en el vocabulario
+    def _coincidencias(self, termino):
+        encontrados = {}
+        for id_token in self._tokens_con(termino):
+            token = self.tokens[id_token]
+            if token == termino:
+                encontrados[id_token] = EXACTA
+            elif token.startswith(termino):
+                encontrados[id_token] = PREFIJO
+            else:
+                encontrados[id_token] = CONTENIDA
+        if not encontrados:
+            for id_token, errores in self._tokens_parecidos(termino).items():
+                encontrados[id_token] = APROXIMADA - 0.1 * (errores - 1)
+        return encontrados
+
+    # Puntaje de los cócteles que coinciden con todas las palabras de la
+    # consulta (AND); None si la consulta no tiene palabras
+    def puntajes(self, consulta):
+        resultado = None
+        for termino in tokenizar(consulta):
+            por_coctel = {}
+            for id_token, calidad in self._coincidencias(termino).items():
+                for coctel, peso in self.pesos[id_token].items():
+                    puntaje = peso * calidad
+                    if puntaje > por_coctel.get(coctel, 0):
+                        por_coctel[coctel] = puntaje
+
+            if resultado is None:
+                resultado = por_coctel
+            else:
+                resultado = {c: p + por_coctel[c] for c, p in resultado.items() if c in por_coctel}
+            if not resultado:
+                break
+        return resultado
+
+    # Cócteles que contienen todas las palabras de la consulta (AND)
+    def buscar(self, consulta):
+        return set(self.puntajes(consulta) or ())
+
+    # Cócteles de la consulta, del más al menos relevante (empates por nombre)
+    def ranking(self, consulta):
+        puntajes = self.puntajes(consulta) or {}
+        return sorted(puntajes, key=lambda c: (-puntajes[c], c))
+
+
+# === Construcción desde las hojas del libro ===
+
+# Nombre del cóctel, texto de las columnas no numéricas y, si se pide, los
+# nombres de las columnas numéricas con valor (ingredientes o garnituras)
+def _documentos_hoja(df, col_coctel="coctel", con_columnas=False):
+    columnas_texto = [
+        col for col in df.columns
+        if col != col_coctel and not pd.api.types.is_numeric_dtype(df[col])
+    ]
+    columnas_numericas = [
+        col for col in df.columns
+        if col != col_coctel and pd.api.types.is_numeric_dtype(df[col])
+    ]
+
+    for _, fila in df.iterrows():
+        coctel = fila[col_coctel]
+        if pd.isna(coctel):
+            continue
+        yield coctel, coctel, "nombre"
+        for col in columnas_texto:
+            if pd.notna(fila[col]):
+                yield coctel, fila[col], "texto"
+        # Coincidencia en nombres de columna (ingredientes o garnituras usados)
+        if con_columnas:
+            for col in columnas_numericas:
+                if pd.notna(fila[col]) and fila[col] > 0:
+                    yield coctel, col, "ingrediente"
+
+
+# Ingredientes de cada receta, leídos de las entradas no nulas de la matriz
+# (ver presencia.py)
+def _documentos_ingredientes(matriz):
+    filas, ids, cantidades = matriz.entradas(np.arange(len(matriz.cocteles)))
+    for i, j, cantidad in zip(filas, ids, cantidades):
+        coctel = matriz.cocteles[i]
+        if pd.notna(coctel) and cantidad > 0:
+            yield coctel, matriz.ingredientes[j], "ingrediente"
+
+
+def construir_indice(recetas, matriz, complementos, recursos):
+    documentos = []
+    documentos.extend(_documentos_hoja(recetas, con_columnas=True))
+    documentos.extend(_documentos_ingredientes(matriz))
+    documentos.extend(_documentos_hoja(complementos, con_columnas=True))
+    documentos.extend(_documentos_hoja(recursos))
+    return IndiceBusqueda(documentos)
@@ -0,0 +1,63 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from escalado import UNIDADES, factores
+from ingredientes import LIQUIDO, PLANTILLAS
+
+# === Lista de compras ===
+
+def _formato(valor, unidad):
+    if unidad == "ml":
+        return int(round(valor))
+    valor = round(valor, 2)
+    return int(valor) if valor.is_integer() else valor
+
+
+# Lista de compras agregada de un menú de evento.
+# pedidos: lista de (coctel, cantidad, litros), como en escalado.escalar.
+# Las entradas no nulas de todos los pedidos se suman por ingrediente en una
+# sola pasada; luego se agrupan los ingredientes que se compran igual (mismo nombre y unidad).
+def lista_compras(datos, pedidos, unidad="ml"):
+    matriz = datos.matriz
+    registro = datos.registro
+    _, filas, factor = factores(datos, pedidos)
+
+    id_pedido, id_ingrediente, cantidades = matriz.entradas(filas)
+    totales = np.bincount(
+        id_ingrediente, weights=cantidades * factor[id_pedido], minlength=len(matriz.ingredientes)
+    )
+    usados = np.nonzero(totales)[0]
+    jarabes = set(datos.jarabes["jarabe"])
+
+    tabla = pd.DataFrame({
+        "ingrediente": np.asarray(matriz.ingredientes, dtype=object)[usados],
+        "categoria": registro.categorias[usados],
+        "nombre": registro.nombres[usados],
+        "envase": registro.envases[usados],
+        "total": totales[usados],
+    })
+    tabla = tabla.groupby(["categoria", "nombre"], sort=False, as_index=False).agg(
+        ingrediente=("ingrediente", "first"), envase=("envase", "first"), total=("total", "sum")
+    )
+
+    lineas = []
+    for fila in tabla.itertuples(index=False):
+        if fila.categoria == LIQUIDO:
+            cantidad = _formato(fila.total * UNIDADES[unidad], unidad)
+            linea = f"{cantidad} {unidad} de {fila.nombre}"
+            if fila.ingrediente in jarabes:
+                linea += " (preparación casera)"
+            elif fila.envase > 0:
+                botellas = math.ceil(fila.total / fila.envase)
+                linea += f" → {botellas} envase(s) de {int(fila.envase)} ml"
+        else:
+            # Lo que se compra por unidad, cucharada o gramo se redondea hacia arriba
+            linea = PLANTILLAS[fila.categoria][1].format(
+                cantidad=math.ceil(round(fila.total, 6)), nombre=fila.nombre
+            )
+        lineas.append(linea)
+
+    tabla["linea"] = lineas
+    return tabla
@@ -0,0 +1,422 @@
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import zipfile
+from dataclasses import dataclass
+from xml.etree import ElementTree
+
+import numpy as np
+import pandas as pd
+
+from busqueda import IndiceBusqueda, construir_indice
+from despensa import IndiceDespensa
+from ingredientes import RegistroIngredientes
+from presencia import COLUMNAS_METADATOS, MatrizPresencia
+from similares import calcular_similares
+
+# === Configuración ===
+
+RUTA_RECETAS = "data/recetas.xlsx"
+DIRECTORIO_CACHE = ".cache"
+
+# Versión del artefacto compilado: subirla invalida los pickles anteriores
+VERSION_FORMATO = 12
+
+# Atributo de Datos -> hoja del libro
+HOJAS = {
+    "recetas": "receta",
+    "complementos": "complementos",
+    "tecnicas": "tecnicas",
+    "jarabes": "jarabe",
+    "recursos": "recurso",
+    "ingredientes": "ingrediente",
+}
+
+# Atributo de Datos -> columna por la que se indexan sus filas
+CLAVES = {
+    "recetas": "coctel",
+    "complementos": "coctel",
+    "recursos": "coctel",
+    "tecnicas": "tecnica",
+    "jarabes": "jarabe",
+    "ingredientes": "ingrediente",
+}
+
+log = logging.getLogger(__name__)
+
+
+# === Conjunto de datos ===
+
+@dataclass(frozen=True, eq=False)
+class Datos:
+    recetas: pd.DataFrame
+    complementos: pd.DataFrame
+    tecnicas: pd.DataFrame
+    jarabes: pd.DataFrame
+    recursos: pd.DataFrame
+    ingredientes: pd.DataFrame
+    indice: IndiceBusqueda  # búsqueda por palabra clave
+    matriz: MatrizPresencia  # presencia de ingredientes por cóctel
+    registro: RegistroIngredientes  # unidad, nombre y envase de cada ingrediente
+    despensa: IndiceDespensa  # ingredientes requeridos por cóctel, como bits
+    similares: dict  # coctel -> ((coctel parecido, similitud), ...)
+    posiciones: dict  # hoja -> {clave: posición de su fila}
+    problemas: tuple  # errores de integridad encontrados al cargar
+    huella: str  # sha256 del libro del que provienen
+    firmas: dict  # hoja -> huella de su contenido en el libro
+    versiones: dict  # coctel -> huella de todo lo que se muestra de él
+
+    # Búsquedas por nombre en O(1); devuelven la fila o None si no existe
+
+    def _fila(self, hoja, clave):
+        i = self.posiciones[hoja].get(clave)
+        return None if i is None else getattr(self, hoja).iloc[i]
+
+    def receta(self, coctel):
+        return self._fila("recetas", coctel)
+
+    def complemento(self, coctel):
+        return self._fila("complementos", coctel)
+
+    def recurso(self, coctel):
+        return self._fila("recursos", coctel)
+
+    def tecnica(self, tecnica):
+        return self._fila("tecnicas", tecnica)
+
+    def jarabe(self, jarabe):
+        return self._fila("jarabes", jarabe)
+
+
+# === Índices e integridad ===
+
+# Clave -> posición de su primera fila (se ignoran las claves vacías)
+def _posiciones(df, columna):
+    posiciones = {}
+    for i, clave in enumerate(df[columna]):
+        if pd.notna(clave):
+            posiciones.setdefault(clave, i)
+    return posiciones
+
+
+# Revisa el libro y devuelve la lista de problemas encontrados
+def validar(tablas, registro):
+    problemas = []
+
+    for hoja, columna in CLAVES.items():
+        nombres = tablas[hoja][columna].dropna()
+        for nombre in sorted(set(nombres[nombres.duplicated()])):
+            problemas.append(f"{HOJAS[hoja]}: '{nombre}' está repetido")
+
+    recetas = tablas["recetas"]
+    cocteles = set(recetas["coctel"].dropna())
+
+    for hoja in ("complementos", "recursos"):
+        for coctel in sorted(set(tablas[hoja]["coctel"].dropna()) - cocteles):
+            problemas.append(f"{HOJAS[hoja]}: '{coctel}' no tiene receta")
+
+    tecnicas = set(tablas["tecnicas"]["tecnica"].dropna())
+    for coctel, tecnica in zip(recetas["coctel"], recetas["tecnica"]):
+        if tecnica not in tecnicas:
+            problemas.append(f"receta: '{coctel}' usa la técnica '{tecnica}', que no está en tecnicas")
+
+    for coctel, volumen, capacidad in zip(
+        recetas["coctel"], recetas["volumen"], recetas["capacidad_vaso_sin_hielo"]
+    ):
+        if pd.isna(volumen) or volumen <= 0:
+            problemas.append(f"receta: '{coctel}' no tiene volumen")
+        if pd.isna(capacidad):
+            problemas.append(f"receta: '{coctel}' no tiene capacidad_vaso_sin_hielo")
+
+    # Un jarabe es un ingrediente con preparación en la hoja jarabe (ver
+    # detalle.py y compras.py); aquí el nombre solo sirve para avisar de los
+    # que parecen jarabes y no la tienen
+    jarabes = set(tablas["jarabes"]["jarabe"].dropna())
+    for columna in registro.ingredientes:
+        if columna.startswith("Jarabe") and columna not in jarabes:
+            problemas.append(f"receta: la columna '{columna}' no tiene preparación en jarabe")
+
+    for ingrediente in registro.sin_registro:
+        problemas.append(f"ingrediente: falta '{ingrediente}' (se mostrará en ml)")
+    for unidad in registro.unidades_desconocidas:
+        problemas.append(f"ingrediente: unidad desconocida '{unidad}' (se mostrará en ml)")
+
+    return problemas
+
+
+# === Lectura y compilación del libro ===
+
+# Huella del contenido del libro (no depende de la fecha de modificación)
+def _huella_archivo(ruta):
+    sha = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 16), b""):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+# Huella de cada hoja dentro del .xlsx (un zip con un XML por hoja), sin
+# parsearla. Los textos viven en sharedStrings.xml, compartido por todas las
+# hojas: si una hoja tiene textos, su huella también depende de ese archivo.
+# Si el libro no se puede leer así se devuelve {} (todas cuentan como nuevas)
+_NS_LIBRO = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_RELACION = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+
+
+def _firmas_hojas(ruta):
+    try:
+        with zipfile.ZipFile(ruta) as libro:
+            archivos = set(libro.namelist())
+            relaciones = ElementTree.fromstring(libro.read("xl/_rels/workbook.xml.rels"))
+            destinos = {r.get("Id"): r.get("Target") for r in relaciones}
+            textos = b""
+            if "xl/sharedStrings.xml" in archivos:
+                textos = hashlib.sha256(libro.read("xl/sharedStrings.xml")).digest()
+
+            firmas = {}
+            for hoja in ElementTree.fromstring(libro.read("xl/workbook.xml")).iter(f"{_NS_LIBRO}sheet"):
+                destino = destinos[hoja.get(f"{_NS_RELACION}id")]
+                destino = destino.lstrip("/") if destino.startswith("/") else f"xl/{destino}"
+                contenido = libro.read(destino)
+                sha = hashlib.sha256(contenido)
+                if b't="s"' in contenido:
+                    sha.update(textos)
+                firmas[hoja.get("name")] = sha.hexdigest()
+            return firmas
+    except (OSError, KeyError, zipfile.BadZipFile, ElementTree.ParseError):
+        return {}
+
+
+# Huella de cada cóctel: sus filas en receta, complementos y recurso, sus
+# cantidades, la técnica, los jarabes e ingredientes que usa y sus similares.
+# Si no cambia, lo que se muestra del cóctel tampoco (ver detalle.py)
+def _versiones(tablas, matriz, similares):
+    def filas(attr):
+        por_clave = {}
+        df = tablas[attr]
+        for clave, fila in zip(df[CLAVES[attr]], df.itertuples(index=False)):
+            if pd.notna(clave):
+                por_clave.setdefault(clave, tuple(fila))
+        return por_clave
+
+    hojas = {attr: filas(attr) for attr in HOJAS}
+    versiones = {}
+    for coctel, fila in hojas["recetas"].items():
+        receta = dict(zip(tablas["recetas"].columns, fila))
+        _, ids, cantidades = matriz.entradas([matriz.fila[coctel]])
+        usados = [matriz.ingredientes[j] for j, cantidad in zip(ids, cantidades) if cantidad > 0]
+        partes = [
+            fila,
+            list(zip(ids.tolist(), cantidades.tolist())),
+            hojas["complementos"].get(coctel),
+            hojas["recursos"].get(coctel),
+            hojas["tecnicas"].get(receta["tecnica"]),
+            [hojas["jarabes"].get(c) for c in usados],
+            [hojas["ingredientes"].get(c) for c in usados],
+            similares.get(coctel),
+        ]
+        versiones[coctel] = hashlib.sha256(repr(partes).encode("utf-8")).hexdigest()[:16]
+    return versiones
+
+
+# Tipos compactos para las tablas compartidas por todas las sesiones:
+# - nombres (claves) y textos con pocos valores distintos -> category
+# - números -> el tipo más chico que los representa sin pérdida
+def _compactar(df, clave):
+    columnas = {}
+    for columna in df.columns:
+        serie = df[columna]
+        if pd.api.types.is_float_dtype(serie):
+            compacta = serie.astype(np.float32)
+            if compacta.astype(np.float64).equals(serie.astype(np.float64)):
+                columnas[columna] = compacta
+        elif pd.api.types.is_integer_dtype(serie):
+            columnas[columna] = pd.to_numeric(serie, downcast="integer")
+        elif columna == clave or serie.nunique() <= len(serie) // 2:
+            columnas[columna] = serie.astype("category")
+    return df.assign(**columnas) if columnas else df
+
+
+# Los arreglos de numpy no conservan el modo de solo lectura al pasar por
+# pickle (los de objetos); se vuelve a fijar al cargar
+def _solo_lectura(datos):
+    for estructura in (datos.matriz, datos.registro, datos.despensa):
+        for valor in vars(estructura).values():
+            if isinstance(valor, np.ndarray):
+                valor.setflags(write=False)
+    return datos
+
+
+# Parsear el libro una sola vez, todas las hojas en la misma lectura,
+# y precalcular las estructuras derivadas. Con `anterior` (la versión en
+# memoria) solo se leen las hojas cuya huella cambió, y solo se recalcula lo
+# que depende de hojas que de verdad cambiaron; el resto se reutiliza tal cual
+def _leer_libro(ruta, huella, anterior=None):
+    firmas = _firmas_hojas(ruta)
+    tablas = {}
+    if anterior is not None:
+        for attr, hoja in HOJAS.items():
+            if firmas.get(hoja) is not None and firmas.get(hoja) == anterior.firmas.get(hoja):
+                tablas[attr] = getattr(anterior, attr)
+
+    matriz = anterior.matriz if anterior is not None else None
+    por_leer = {attr: hoja for attr, hoja in HOJAS.items() if attr not in tablas}
+    if por_leer:
+        hojas = pd.read_excel(ruta, sheet_name=list(por_leer.values()))
+        for attr, hoja in por_leer.items():
+            df = hojas[hoja]
+            if attr == "recetas":
+                # Las cantidades pasan a la matriz en formato largo (ver
+                # presencia.py); en la tabla quedan solo los metadatos
+                nueva = MatrizPresencia(df)
+                if matriz is None or not nueva.igual(matriz):
+                    matriz = nueva
+                df = df[[c for c in df.columns if c in COLUMNAS_METADATOS]]
+            tabla = _compactar(df, CLAVES[attr])
+            if (
+                anterior is not None and tabla.equals(getattr(anterior, attr))
+                and (attr != "recetas" or matriz is anterior.matriz)
+            ):
+                tabla = getattr(anterior, attr)  # la huella cambió, el contenido no
+            tablas[attr] = tabla
+
+    cambiadas = {attr for attr in HOJAS if anterior is None or tablas[attr] is not getattr(anterior, attr)}
+    if anterior is not None:
+        log.info("%s: cambiaron %s", ruta, ", ".join(HOJAS[a] for a in sorted(cambiadas)) or "ninguna hoja")
+
+    if cambiadas & {"recetas", "complementos", "recursos"}:
+        indice = construir_indice(tablas["recetas"], matriz, tablas["complementos"], tablas["recursos"])
+    else:
+        indice = anterior.indice
+
+    if cambiadas & {"recetas", "ingredientes"}:
+        registro = RegistroIngredientes(tablas["ingredientes"], matriz.ingredientes)
+        despensa = IndiceDespensa(matriz, registro)
+        similares = calcular_similares(tablas["recetas"], matriz, registro)
+    else:
+        registro = anterior.registro
+        despensa, similares = anterior.despensa, anterior.similares
+
+    posiciones = {
+        hoja: _posiciones(tablas[hoja], columna) if hoja in cambiadas else anterior.posiciones[hoja]
+        for hoja, columna in CLAVES.items()
+    }
+    return Datos(
+        **tablas,
+        indice=indice,
+        matriz=matriz,
+        registro=registro,
+        despensa=despensa,
+        similares=similares,
+        posiciones=posiciones,
+        problemas=tuple(validar(tablas, registro)),
+        huella=huella,
+        firmas=firmas,
+        versiones=_versiones(tablas, matriz, similares),
+    )
+
+
+# Rutas del artefacto compilado: el pickle de Datos y, aparte, la tabla de
+# cantidades de la matriz, que se abre con mmap (ver presencia.py)
+def _ruta_compilado(huella):
+    base = os.path.join(DIRECTORIO_CACHE, f"recetas-{huella[:16]}-v{VERSION_FORMATO}")
+    return f"{base}.pkl", f"{base}-cantidades.npy"
+
+
+# Cargar el artefacto compilado del libro, generándolo si no existe (a partir
+# de `anterior`, si hay una versión en memoria)
+def _cargar_compilado(ruta, anterior=None):
+    huella = _huella_archivo(ruta)
+    ruta_pkl, ruta_npy = _ruta_compilado(huella)
+
+    if os.path.exists(ruta_pkl):
+        try:
+            with open(ruta_pkl, "rb") as f:
+                return _solo_lectura(pickle.load(f))
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError, AttributeError):
+            pass  # artefacto corrupto o de otra versión: se vuelve a generar
+
+    datos = _solo_lectura(_leer_libro(ruta, huella, anterior))
+
+    try:
+        os.makedirs(DIRECTORIO_CACHE, exist_ok=True)
+        # Primero la tabla de la matriz: el pickle solo guarda su ruta
+        datos.matriz.guardar(ruta_npy)
+        # Escritura atómica para que otro proceso nunca lea un pickle a medias
+        tmp = f"{ruta_pkl}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(datos, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, ruta_pkl)
+
+        # Eliminar artefactos de versiones anteriores del libro
+        for nombre in os.listdir(DIRECTORIO_CACHE):
+            viejo = os.path.join(DIRECTORIO_CACHE, nombre)
+            if nombre.startswith("recetas-") and nombre.endswith((".pkl", ".npy")) and viejo not in (ruta_pkl, ruta_npy):
+                os.remove(viejo)
+    except OSError:
+        pass  # sin permisos de escritura: se sigue trabajando solo en memoria
+
+    return datos
+
+
+# === Memoización en el proceso ===
+
+# ruta -> (firma del archivo, Datos). Cada versión es inmutable; recargar el
+# libro arma una nueva y la reemplaza con una sola asignación, así que un
+# rerun en curso sigue trabajando con la versión que ya tenía
+_memo = {}
+_memo_lock = threading.Lock()
+
+# Libros que revisa un hilo en segundo plano (ver recarga.py); para ellos
+# cargar_datos ni siquiera mira el archivo
+vigilados = set()
+
+
+# Fecha de modificación y tamaño de un archivo o carpeta (None si no existe);
+# también la usa recarga.py para saber si el libro cambió
+def firma_archivo(ruta):
+    try:
+        estado = os.stat(ruta)
+    except OSError:
+        return None
+    return estado.st_mtime_ns, estado.st_size
+
+
+# Vuelve a cargar el libro si cambió desde la última vez. Devuelve
+# (anterior, actual): si no cambió, ambos son el mismo objeto; en la primera
+# carga anterior es None
+def recargar(ruta=RUTA_RECETAS):
+    firma = firma_archivo(ruta)
+    with _memo_lock:
+        en_memo = _memo.get(ruta)
+        anterior = en_memo[1] if en_memo is not None else None
+        if en_memo is not None and en_memo[0] == firma:
+            return anterior, anterior
+        datos = _cargar_compilado(ruta, anterior)
+        for problema in datos.problemas:
+            log.warning("%s: %s", ruta, problema)
+        _memo[ruta] = (firma, datos)
+        return anterior, datos
+
+
+# Datos del libro, compartidos por todas las sesiones y reruns del proceso.
+# Solo se revisa mtime y tamaño en cada llamada; si el libro cambia se recarga.
+def cargar_datos(ruta=RUTA_RECETAS):
+    en_memo = _memo.get(ruta)
+    if en_memo is not None and (ruta in vigilados or en_memo[0] == firma_archivo(ruta)):
+        return en_memo[1]
+    return recargar(ruta)[1]
+
+
+# Revisión del libro desde la consola: python datos.py
+if __name__ == "__main__":
+    datos = cargar_datos()
+    for problema in datos.problemas:
+        print(problema)
+    print(f"{len(datos.problemas)} problema(s) en {RUTA_RECETAS}")
+    # Memoria que ocupa el conjunto compartido por todas las sesiones
+    for attr, hoja in HOJAS.items():
+        print(f"{hoja}: {getattr(datos, attr).memory_usage(deep=True).sum() / 1024:.0f} KiB")
+    print(f"matriz: {datos.matriz.nbytes / 1024:.0f} KiB ({len(datos.matriz.tabla)} cantidades no nulas)")
@@ -0,0 +1,81 @@
+import numpy as np
+
+# === ¿Qué puedo preparar? ===
+
+# Dado lo que el usuario tiene en casa, cuenta cuántos ingredientes le faltan
+# para cada cóctel. Cada cóctel se guarda como un conjunto de bits (uno por
+# ingrediente) y el inventario también: lo que falta es requeridos & ~inventario,
+# y se cuenta con popcount. Así una consulta es una sola pasada vectorizada
+# sobre todo el catálogo, aunque crezca a miles de cócteles.
+
+# Unidad de los ingredientes que no se exigen (sal, pimienta, canela "a gusto")
+OPCIONAL = "a gusto"
+
+# Sugerencias por defecto: cócteles a los que les faltan hasta 2 ingredientes
+MAXIMO_FALTANTES = 2
+
+
+class IndiceDespensa:
+    def __init__(self, matriz, registro):
+        # Las columnas con el mismo nombre para mostrar (ej: "Azúcar", "Azúcar 2")
+        # son el mismo ingrediente para la despensa; se muestran con mayúscula
+        filas, ids, cantidades = matriz.entradas(np.arange(len(matriz.cocteles)))
+        requerido = (cantidades > 0) & (registro.categorias[ids] != OPCIONAL)
+        filas, ids = filas[requerido], ids[requerido]
+        nombres = [n[:1].upper() + n[1:] for n in registro.nombres]
+        self.ingredientes = sorted({nombres[j] for j in np.unique(ids)})
+        posicion = {nombre: k for k, nombre in enumerate(self.ingredientes)}
+
+        requeridos = np.zeros((len(matriz.cocteles), len(self.ingredientes)), dtype=bool)
+        requeridos[filas, [posicion[nombres[j]] for j in ids]] = True
+
+        self.cocteles = matriz.cocteles
+        self._posicion = posicion
+        self.requeridos = requeridos
+        # bits[i]: ingredientes del cóctel i empaquetados en bytes
+        self.bits = np.packbits(requeridos, axis=1)
+
+        for arreglo in (self.requeridos, self.bits):
+            arreglo.setflags(write=False)
+
+    # Ingredientes del inventario como bits; se ignoran los que ningún cóctel usa
+    def _inventario(self, inventario):
+        tiene = np.zeros(len(self.ingredientes), dtype=bool)
+        for nombre in inventario:
+            k = self._posicion.get(nombre)
+            if k is not None:
+                tiene[k] = True
+        return tiene
+
+    def _faltantes(self, tiene):
+        return np.bitwise_count(self.bits & ~np.packbits(tiene)).sum(axis=1, dtype=np.int32)
+
+    # Número de ingredientes que faltan para cada cóctel (fila de la matriz)
+    def faltantes(self, inventario):
+        return self._faltantes(self._inventario(inventario))
+
+    # Cócteles posibles, de menos a más ingredientes faltantes (empates por
+    # nombre): lista de (coctel, ingredientes que faltan).
+    # mascara: limita la búsqueda a ciertos cócteles (ej: filtros de la app)
+    def sugerencias(self, inventario, maximo=MAXIMO_FALTANTES, mascara=None):
+        tiene = self._inventario(inventario)
+        faltan = self._faltantes(tiene)
+
+        candidatos = faltan <= maximo
+        if mascara is not None:
+            candidatos &= mascara
+        filas = [
+            i for i in np.nonzero(candidatos)[0]
+            if isinstance(self.cocteles[i], str)
+        ]
+        filas.sort(key=lambda i: (faltan[i], self.cocteles[i]))
+
+        vistos = set()
+        resultado = []
+        for i in filas:
+            if self.cocteles[i] in vistos:
+                continue
+            vistos.add(self.cocteles[i])
+            faltantes = self.requeridos[i] & ~tiene
+            resultado.append((self.cocteles[i], [self.ingredientes[k] for k in np.nonzero(faltantes)[0]]))
+        return resultado
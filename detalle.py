@@ -0,0 +1,170 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import pandas as pd
+
+from imagenes import ruta_imagen
+
+# === Configuración ===
+
+# Cócteles cuyo detalle se mantiene en memoria
+MAXIMO_EN_CACHE = 256
+
+
+# === Modelo del detalle de un cóctel ===
+
+# Todo lo que se muestra de un cóctel y no depende de la cantidad pedida.
+# Los textos ya vienen formateados para st.markdown / st.write.
+@dataclass(frozen=True)
+class Detalle:
+    coctel: str
+    imagen: str | None               # ruta de la foto, si existe
+    preparacion: str | None
+    jarabes: tuple                   # (jarabe, preparación)
+    tecnica: str
+    con_hielo: bool
+    cristaleria: str
+    garnitura: tuple                 # complementos con valor 1
+    observaciones: str | None
+    similares: tuple                 # (coctel, similitud), ver similares.py
+    recursos: "Recursos | None"      # None si no hay recursos adicionales
+
+
+@dataclass(frozen=True)
+class Recursos:
+    imagen: str | None               # nombre del archivo en imagenes/
+    imagen_ruta: str | None          # ruta, si el archivo existe
+    imagen_texto: str                # créditos de la imagen
+    titulo: str | None               # recurso largo (poema, relato)
+    contenido: str
+    enlace_otro: tuple | None        # (url, texto)
+    musica: tuple | None             # (url, texto, cita)
+    musica_2: tuple | None
+
+
+def _texto(fila, columna):
+    if fila is None:
+        return None
+    valor = fila.get(columna)
+    return valor if pd.notna(valor) else None
+
+
+def _recursos(fila):
+    if fila is None:
+        return None
+
+    otro = musica = musica_2 = None
+    if _texto(fila, "texto_enlace_otro") is not None and _texto(fila, "url_otro") is not None:
+        otro = (fila["url_otro"], fila["texto_enlace_otro"])
+    if _texto(fila, "texto_enlace_musica") is not None and _texto(fila, "url_musica") is not None:
+        musica = (fila["url_musica"], fila["texto_enlace_musica"], _texto(fila, "cita_letra"))
+    if _texto(fila, "texto_enlace_musica_2") is not None and _texto(fila, "url_musica_2") is not None:
+        musica_2 = (fila["url_musica_2"], fila["texto_enlace_musica_2"], _texto(fila, "cita_letra_2"))
+
+    imagen = imagen_ruta = None
+    imagen_texto = ""
+    if _texto(fila, "imagen") is not None:
+        lineas = [l.strip() for l in fila["imagen"].split("\n") if l.strip()]
+        # Primera línea: nombre del archivo; el resto: créditos
+        imagen = lineas[0] if len(lineas) > 0 else ""
+        imagen_texto = "\n".join(lineas[1:]) if len(lineas) > 1 else ""
+        imagen_ruta = ruta_imagen(imagen) if imagen else None
+
+    titulo = None
+    contenido = ""
+    if _texto(fila, "recurso") is not None:
+        lineas = fila["recurso"].strip().split("\n")
+        titulo = lineas[0] if lineas else "Recurso"
+        contenido = "\n".join(lineas[1:]).strip()
+
+    if titulo is None and imagen is None and not (otro or musica or musica_2):
+        return None
+
+    return Recursos(
+        imagen=imagen,
+        imagen_ruta=imagen_ruta,
+        imagen_texto=imagen_texto,
+        titulo=titulo,
+        contenido=contenido,
+        enlace_otro=otro,
+        musica=musica,
+        musica_2=musica_2,
+    )
+
+
+def _calcular(datos, coctel):
+    fila_receta = datos.receta(coctel)
+    fila_recurso = datos.recurso(coctel)
+
+    # Jarabes usados por el cóctel: sus ingredientes que tienen preparación
+    # en la hoja jarabe (la misma regla que la lista de compras)
+    jarabes = []
+    _, ids, cantidades = datos.matriz.entradas([datos.matriz.fila[coctel]])
+    for j, cantidad in zip(ids, cantidades):
+        fila_jarabe = datos.jarabe(datos.matriz.ingredientes[j]) if cantidad > 0 else None
+        if fila_jarabe is not None:
+            jarabes.append((datos.matriz.ingredientes[j], fila_jarabe["preparación"]))
+
+    tecnica_info = datos.tecnica(fila_receta["tecnica"])
+    if tecnica_info is not None:
+        tecnica = f"🛠️ **{tecnica_info['nombre_español']} ({fila_receta['tecnica']})** – {tecnica_info['descripción']}"
+    else:
+        tecnica = f"🛠️ **{fila_receta['tecnica']}**"
+
+    hielo = fila_receta["hielo"]
+    con_hielo = pd.notna(hielo) and str(hielo).strip().lower() in ["Sí", "Si", "sí", "si"]
+
+    garnitura = ()
+    fila_complementos = datos.complemento(coctel)
+    if fila_complementos is not None:
+        decoraciones = fila_complementos.drop("coctel")
+        garnitura = tuple(decoraciones[decoraciones == 1].index.tolist())
+
+    return Detalle(
+        coctel=coctel,
+        imagen=ruta_imagen(f"{coctel}.jpg"),
+        preparacion=_texto(fila_recurso, "preparacion"),
+        jarabes=tuple(jarabes),
+        tecnica=tecnica,
+        con_hielo=con_hielo,
+        cristaleria=f"🥂 {fila_receta['vaso']} – {int(fila_receta['capacidad_vaso_sin_hielo'])} ml",
+        garnitura=garnitura,
+        observaciones=_texto(fila_recurso, "observaciones"),
+        similares=datos.similares.get(coctel, ()),
+        recursos=_recursos(fila_recurso),
+    )
+
+
+# === Cache por cóctel ===
+
+# (coctel, versión) -> Detalle, del menos al más usado. La clave es la
+# versión del cóctel (ver Datos.versiones) y no `datos`: al recargar el libro
+# solo se recalculan los cócteles cuyo contenido cambió
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def detalle(datos, coctel):
+    clave = (coctel, datos.versiones.get(coctel))
+    with _cache_lock:
+        info = _cache.get(clave)
+        if info is not None:
+            _cache.move_to_end(clave)
+            return info
+
+    info = _calcular(datos, coctel)
+    with _cache_lock:
+        _cache[clave] = info
+        while len(_cache) > MAXIMO_EN_CACHE:
+            _cache.popitem(last=False)
+    return info
+
+
+# Olvida el detalle de algunos cócteles (todos si no se indican), por
+# ejemplo cuando cambian sus imágenes sin que cambie el libro
+def invalidar(cocteles=None):
+    with _cache_lock:
+        for clave in list(_cache):
+            if cocteles is None or clave[0] in cocteles:
+                del _cache[clave]
@@ -0,0 +1,108 @@
+import math
+
+from escalado import MAXIMO_COCTELES, MAXIMO_LITROS
+from filtros import TODOS
+
+# === Estado de la app en la URL ===
+
+# La selección de la barra lateral se refleja en los parámetros de la URL
+# (ej: ?coctel=Negroni&cantidad=4&unidad=oz). Así un enlace abre la app en el
+# mismo estado, y la misma URL dibuja siempre la misma página. Este módulo
+# solo traduce entre los valores de los widgets y los parámetros; app.py los
+# lee al abrir la sesión y los actualiza en cada rerun.
+
+# Clave del widget en session_state -> parámetro de la URL
+PARAMETROS = {
+    "palabra_clave_input": "q",
+    "licor_sel": "licor",
+    "coctel_sel": "coctel",
+    "modo_forzado": "modo",
+    "unidad_label": "unidad",
+    "cantidad": "cantidad",
+    "litros": "litros",
+}
+
+# Valor en la URL -> opción del widget
+MODOS = {
+    "cantidad": "Cantidad de cócteles",
+    "litros": "Volumen total (litros)",
+    "menu": "Menú de evento",
+    "despensa": "¿Qué puedo preparar?",
+}
+UNIDADES = {
+    "ml": "Mililitros (ml)",
+    "oz": "Onzas (oz)",
+}
+
+# Valores iniciales de los widgets; no se escriben en la URL
+PREDETERMINADOS = {
+    "palabra_clave_input": "",
+    "licor_sel": TODOS,
+    "modo_forzado": MODOS["cantidad"],
+    "unidad_label": UNIDADES["ml"],
+    "cantidad": 1,
+    "litros": 1.0,
+}
+
+# Widgets que solo existen en algunos modos
+SOLO_EN_MODOS = {
+    "unidad_label": (MODOS["cantidad"], MODOS["menu"]),
+    "cantidad": (MODOS["cantidad"],),
+    "litros": (MODOS["litros"],),
+}
+
+
+def _positivo(texto, tipo, maximo):
+    try:
+        valor = float(texto)
+    except ValueError:
+        return None
+    if not math.isfinite(valor) or valor <= 0 or valor > maximo or (tipo is int and not valor.is_integer()):
+        return None
+    return tipo(valor)
+
+
+# Parámetros de la URL -> {clave del widget: valor}. Los valores que no se
+# pueden interpretar se ignoran (el widget queda con su valor inicial); que
+# el licor o el cóctel existan lo revisa app.py contra sus opciones
+def leer(parametros):
+    estado = {}
+    for clave, nombre in PARAMETROS.items():
+        texto = parametros.get(nombre)
+        if not texto:
+            continue
+        if clave == "modo_forzado":
+            valor = MODOS.get(texto)
+        elif clave == "unidad_label":
+            valor = UNIDADES.get(texto)
+        elif clave == "cantidad":
+            valor = _positivo(texto, int, MAXIMO_COCTELES)
+        elif clave == "litros":
+            valor = _positivo(texto, float, MAXIMO_LITROS)
+        else:
+            valor = texto
+        if valor is not None:
+            estado[clave] = valor
+    return estado
+
+
+# {clave del widget: valor} -> {parámetro: texto, o None para quitarlo}.
+# Solo incluye las claves recibidas; los valores iniciales y los widgets que
+# no corresponden al modo se quitan, así cada estado tiene una sola URL
+def escribir(estado):
+    modo = estado.get("modo_forzado")
+    parametros = {}
+    for clave, valor in estado.items():
+        if valor == PREDETERMINADOS.get(clave) or (modo is not None and modo not in SOLO_EN_MODOS.get(clave, (modo,))):
+            valor = None
+        elif clave == "modo_forzado":
+            valor = next((k for k, v in MODOS.items() if v == valor), None)
+        elif clave == "unidad_label":
+            valor = next((k for k, v in UNIDADES.items() if v == valor), None)
+        elif clave == "cantidad" and valor is not None:
+            valor = int(valor)
+        elif clave == "litros" and valor is not None:
+            # repr da el float más corto que se lee igual (1.0 -> "1")
+            valor = repr(float(valor)).removesuffix(".0")
+        parametros[PARAMETROS[clave]] = str(valor) if valor not in (None, "") else None
+    return parametros
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+from ingredientes import LIQUIDO, PLANTILLAS
+
+# Factor para pasar de ml a cada unidad de volumen
+UNIDADES = {"ml": 1, "oz": 1 / 30}
+
+# Pedido máximo de un cóctel (la app, la URL y la API rechazan valores
+# mayores): con números enormes las cantidades escaladas se desbordan a inf
+MAXIMO_COCTELES = 10000
+MAXIMO_LITROS = 1000
+
+
+# === Escalado por lotes ===
+
+# Filas de la matriz y factor de escalado de cada pedido
+def factores(datos, pedidos):
+    pedidos = pd.DataFrame(list(pedidos), columns=["coctel", "cantidad", "litros"])
+
+    filas = np.array([datos.matriz.fila[c] for c in pedidos["coctel"]], dtype=int)
+    volumen_base = datos.recetas["volumen"].to_numpy(dtype=float)[filas]
+    cantidad = pedidos["cantidad"].to_numpy(dtype=float)
+    litros = pedidos["litros"].to_numpy(dtype=float)
+
+    volumen_deseado = np.where(np.isnan(litros), cantidad * volumen_base, litros * 1000)
+    return pedidos, filas, volumen_deseado / volumen_base
+
+
+# Escala un lote de pedidos de una vez.
+# pedidos: lista de (coctel, cantidad, litros), con cantidad o litros en None.
+# Devuelve una fila por ingrediente de cada pedido, en el orden de la receta,
+# con la cantidad escalada en ml, la cantidad en la unidad de salida y la
+# línea lista para mostrar.
+def escalar(datos, pedidos, unidad="ml"):
+    matriz = datos.matriz
+    registro = datos.registro
+    pedidos, filas, factor = factores(datos, pedidos)
+
+    # Cantidades escaladas en ml: solo las entradas no nulas de cada pedido
+    id_pedido, id_ingrediente, base = matriz.entradas(filas)
+    ml = base * factor[id_pedido]
+
+    # Solo los líquidos se convierten a la unidad de salida
+    categorias = registro.categorias[id_ingrediente]
+    es_liquido = categorias == LIQUIDO
+    convertido = np.where(es_liquido, ml * UNIDADES[unidad], ml)
+
+    # Formato numérico: enteros salvo onzas, que llevan 2 decimales
+    if unidad == "ml":
+        cantidades = [int(v) for v in np.round(convertido)]
+    else:
+        cantidades = [
+            int(round(v)) if not liquido else (int(r) if r.is_integer() else r)
+            for v, r, liquido in zip(convertido, np.round(convertido, 2), es_liquido)
+        ]
+
+    ingredientes = np.asarray(matriz.ingredientes, dtype=object)[id_ingrediente]
+    nombres = registro.nombres[id_ingrediente]
+    lineas = [
+        PLANTILLAS[cat][0].format(cantidad=c, nombre=n, unidad=unidad)
+        for cat, c, n in zip(categorias, cantidades, nombres)
+    ]
+
+    return pd.DataFrame({
+        "pedido": id_pedido,
+        "coctel": pedidos["coctel"].to_numpy()[id_pedido],
+        "ingrediente": ingredientes,
+        "categoria": categorias,
+        "nombre": nombres,
+        "ml": ml,
+        "cantidad": convertido,
+        "unidad": np.where(es_liquido, unidad, ""),
+        "linea": lineas,
+    })
@@ -0,0 +1,164 @@
+// === Sitio estático del Club de Licores ===
+// Escalado de recetas y búsqueda en el navegador, sin servidor.
+// Replica escalado.py y busqueda.py (sin el orden por relevancia): si cambian
+// allá, cambiar también acá.
+
+"use strict";
+
+// Minúsculas y sin tildes: "Limón" -> "limon"
+function normalizar(texto) {
+  return texto.toLowerCase().normalize("NFKD").replace(/[\u0300-\u036f]/g, "");
+}
+
+function tokenizar(texto) {
+  return normalizar(texto).match(/[\p{L}\p{N}_]+/gu) || [];
+}
+
+function formatear(plantilla, valores) {
+  return plantilla.replace(/\{(\w+)\}/g, (_, clave) => valores[clave]);
+}
+
+// Redondeo a `decimales` como round() de Python (mitades al par)
+function redondear(valor, decimales) {
+  const escala = Math.pow(10, decimales);
+  const x = valor * escala;
+  const piso = Math.floor(x);
+  const resto = x - piso;
+  let r;
+  if (Math.abs(resto - 0.5) < 1e-9) r = piso % 2 === 0 ? piso : piso + 1;
+  else r = Math.round(x);
+  return r / escala;
+}
+
+// === Escalado de la receta ===
+
+function escalar(receta, cantidad, litros, unidad) {
+  const factor = litros > 0 ? (litros * 1000) / receta.volumen : cantidad;
+  return receta.ingredientes.map((ing) => {
+    const ml = ing.ml * factor;
+    const liquido = ing.categoria === receta.liquido;
+    let valor;
+    if (liquido && unidad !== "ml") valor = redondear(ml * receta.unidades[unidad], 2);
+    else valor = redondear(ml, 0);
+    return formatear(receta.plantillas[ing.categoria], {
+      cantidad: valor, nombre: ing.nombre, unidad: unidad,
+    });
+  });
+}
+
+function iniciarReceta() {
+  const datos = document.getElementById("receta-datos");
+  if (!datos) return;
+  const receta = JSON.parse(datos.textContent);
+  const cantidad = document.getElementById("cantidad");
+  const litros = document.getElementById("litros");
+  const unidad = document.getElementById("unidad");
+  const lista = document.getElementById("ingredientes");
+
+  function actualizar() {
+    const l = parseFloat(litros.value);
+    // En volumen total se muestra siempre ml, como en la app
+    unidad.disabled = l > 0;
+    const lineas = escalar(
+      receta, Math.max(parseInt(cantidad.value, 10) || 1, 1), l, l > 0 ? "ml" : unidad.value
+    );
+    lista.replaceChildren(...lineas.map((linea) => {
+      const li = document.createElement("li");
+      li.textContent = linea;
+      return li;
+    }));
+  }
+
+  for (const control of [cantidad, litros, unidad]) control.addEventListener("input", actualizar);
+}
+
+// === Búsqueda en el índice ===
+
+// Errores de tipeo tolerados según el largo del término (busqueda.py)
+function erroresTolerados(termino) {
+  if (termino.length < 4) return 0;
+  return termino.length <= 7 ? 1 : 2;
+}
+
+function trigramas(token) {
+  const relleno = "$$" + token + "$";
+  const grupos = new Set();
+  for (let i = 0; i + 3 <= relleno.length; i++) grupos.add(relleno.slice(i, i + 3));
+  return grupos;
+}
+
+// Distancia de edición con transposiciones, cortando al superar `maximo`
+function distancia(a, b, maximo) {
+  if (Math.abs(a.length - b.length) > maximo) return maximo + 1;
+  let anterior2 = null;
+  let anterior = Array.from({ length: b.length + 1 }, (_, j) => j);
+  for (let i = 1; i <= a.length; i++) {
+    const actual = [i];
+    for (let j = 1; j <= b.length; j++) {
+      const costo = a[i - 1] === b[j - 1] ? 0 : 1;
+      actual[j] = Math.min(anterior[j] + 1, actual[j - 1] + 1, anterior[j - 1] + costo);
+      if (i > 1 && j > 1 && a[i - 1] === b[j - 2] && a[i - 2] === b[j - 1]) {
+        actual[j] = Math.min(actual[j], anterior2[j - 2] + 1);
+      }
+    }
+    if (Math.min(...actual) > maximo) return maximo + 1;
+    anterior2 = anterior;
+    anterior = actual;
+  }
+  return anterior[b.length];
+}
+
+// Tokens que contienen el término o, si no hay ninguno, que están a pocos
+// errores de tipeo
+function tokensDe(indice, termino) {
+  const ids = [];
+  indice.tokens.forEach((token, i) => { if (token.includes(termino)) ids.push(i); });
+  const maximo = erroresTolerados(termino);
+  if (ids.length || !maximo) return ids;
+
+  const delTermino = trigramas(termino);
+  const minimo = Math.max(1, delTermino.size - 3 * maximo);
+  indice.tokens.forEach((token, i) => {
+    let compartidos = 0;
+    for (const t of trigramas(token)) if (delTermino.has(t)) compartidos += 1;
+    if (compartidos >= minimo && distancia(termino, token, maximo) <= maximo) ids.push(i);
+  });
+  return ids;
+}
+
+// Cócteles que contienen todas las palabras (AND); null si no hay palabras
+function buscar(indice, consulta) {
+  let resultado = null;
+  for (const termino of tokenizar(consulta)) {
+    const encontrados = new Set();
+    for (const i of tokensDe(indice, termino)) for (const c of indice.cocteles[i]) encontrados.add(c);
+    resultado = resultado === null ? encontrados
+      : new Set([...resultado].filter((c) => encontrados.has(c)));
+    if (resultado.size === 0) break;
+  }
+  return resultado;
+}
+
+async function iniciarBusqueda() {
+  const caja = document.getElementById("buscar");
+  if (!caja) return;
+  const indice = await (await fetch(caja.dataset.indice)).json();
+  const items = Array.from(document.querySelectorAll("#cocteles li"));
+  const contador = document.getElementById("contador");
+
+  caja.addEventListener("input", () => {
+    const validos = buscar(indice, caja.value);
+    let visibles = 0;
+    for (const item of items) {
+      const visible = validos === null || validos.has(parseInt(item.dataset.id, 10));
+      item.hidden = !visible;
+      if (visible) visibles += 1;
+    }
+    contador.textContent = visibles;
+  });
+}
+
+document.addEventListener("DOMContentLoaded", () => {
+  iniciarReceta();
+  iniciarBusqueda();
+});
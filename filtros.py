@@ -0,0 +1,85 @@
+import datetime
+import hashlib
+
+import numpy as np
+
+# === Filtros del catálogo ===
+
+# Los filtros trabajan con máscaras booleanas sobre las filas de la hoja
+# receta (el mismo orden de la matriz de presencia) y se pueden encadenar
+
+TODOS = "Todos"
+SIN_ALCOHOL = "Sin Alcohol"
+
+
+# Las máscaras pueden ser vistas de solo lectura de la matriz compartida: los
+# filtros siempre devuelven una máscara nueva o la recibida, nunca la modifican
+def todos(datos):
+    return datos.matriz.todos
+
+
+# Cócteles que contienen todas las palabras buscadas en nombre, ingredientes,
+# garnituras o recursos, tolerando errores de tipeo (índice precalculado al
+# cargar los datos, ver busqueda.py)
+def por_palabra(datos, palabra_clave, mascara=None):
+    mascara = todos(datos) if mascara is None else mascara
+    palabra_clave = palabra_clave.strip()
+    if not palabra_clave:
+        return mascara
+    validos = datos.indice.buscar(palabra_clave)
+    return mascara & np.array([c in validos for c in datos.matriz.cocteles], dtype=bool)
+
+
+# Opciones del selector de licor base para los cócteles de la máscara
+def opciones_licor(datos, mascara):
+    matriz = datos.matriz
+    opciones = [TODOS] + sorted(matriz.disponibles(mascara, matriz.licores))
+    if (matriz.sin_alcohol & mascara).any():
+        opciones.append(SIN_ALCOHOL)
+    return opciones
+
+
+def por_licor(datos, licor, mascara=None):
+    mascara = todos(datos) if mascara is None else mascara
+    if licor == SIN_ALCOHOL:
+        return mascara & datos.matriz.sin_alcohol
+    if licor and licor != TODOS:
+        return mascara & datos.matriz.contiene(licor)
+    return mascara
+
+
+# Cócteles que llevan todos los ingredientes indicados (ej: Gin y Vermouth)
+def por_ingredientes(datos, ingredientes, mascara=None):
+    mascara = todos(datos) if mascara is None else mascara
+    if not ingredientes:
+        return mascara
+    return mascara & datos.matriz.contiene(*ingredientes)
+
+
+# Nombres de los cócteles de la máscara, ordenados (el orden se calcula una
+# vez al cargar los datos)
+def cocteles(datos, mascara):
+    matriz = datos.matriz
+    filas = matriz.orden[mascara[matriz.orden]]
+    return list(dict.fromkeys(matriz.cocteles[filas]))
+
+
+# Los mismos cócteles, del más al menos relevante para la palabra clave
+# (nombre > ingredientes > textos); sin palabra clave queda el orden alfabético
+def por_relevancia(datos, palabra_clave, cocteles):
+    if not palabra_clave.strip():
+        return cocteles
+    incluidos = set(cocteles)
+    return [c for c in datos.indice.ranking(palabra_clave) if c in incluidos]
+
+
+# Cóctel del día: el mismo para todas las sesiones durante todo el día (y
+# para la misma lista, el mismo aunque cambie su orden). Es el cóctel que se
+# muestra cuando no se eligió ninguno, en vez de uno al azar
+def coctel_del_dia(cocteles, fecha=None):
+    candidatos = sorted(cocteles)
+    if not candidatos:
+        return None
+    fecha = fecha or datetime.date.today()
+    semilla = hashlib.sha256(fecha.isoformat().encode("utf-8")).digest()
+    return candidatos[int.from_bytes(semilla[:8], "big") % len(candidatos)]
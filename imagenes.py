@@ -0,0 +1,198 @@
+import base64
+import hashlib
+import os
+import sys
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from typing import NamedTuple
+
+from PIL import Image, ImageOps, features
+
+# === Configuración ===
+
+DIRECTORIO_IMAGENES = "imagenes"
+DIRECTORIO_DERIVADAS = os.path.join(".cache", "imagenes")
+
+# Ancho máximo (px) de cada variante; nunca se agranda una imagen
+VARIANTES = {
+    "tarjeta": 400,   # foto del cóctel
+    "recurso": 1000,  # imagen de "Recursos adicionales" (ancho completo)
+    "impresion": 800,  # foto de las tarjetas para imprimir (ver tarjetas.py)
+}
+
+# Formato -> (extensión, opciones de guardado). st.image solo deja pasar sin
+# recodificar JPEG, PNG y GIF; WebP y AVIF son para servir las derivadas fuera
+# de Streamlit (HTML estático)
+FORMATOS = {
+    "JPEG": (".jpg", {"quality": 82, "optimize": True, "progressive": True}),
+    "WEBP": (".webp", {"quality": 80, "method": 4}),
+    "AVIF": (".avif", {"quality": 60}),
+}
+
+
+# Formato efectivo: si Pillow no sabe escribir el pedido se usa JPEG
+def _formato(formato):
+    if formato != "JPEG" and not features.check(formato.lower()):
+        formato = "JPEG"
+    extension, opciones = FORMATOS[formato]
+    return formato, extension, opciones
+
+
+# === Derivadas con nombre según contenido ===
+
+def _huella(ruta, variante, formato):
+    formato, _, opciones = _formato(formato)
+    sha = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 16), b""):
+            sha.update(bloque)
+    # Cambiar el tamaño, el formato o la calidad genera un archivo nuevo
+    sha.update(repr((VARIANTES[variante], formato, sorted(opciones.items()))).encode())
+    return sha.hexdigest()[:20]
+
+
+def _generar(ruta, destino, variante, formato):
+    formato, _, opciones = _formato(formato)
+    with Image.open(ruta) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        ancho = VARIANTES[variante]
+        if img.width > ancho:
+            img = img.resize((ancho, round(img.height * ancho / img.width)), Image.LANCZOS)
+
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        tmp = f"{destino}.{os.getpid()}.{threading.get_ident()}.tmp"
+        img.save(tmp, format=formato, **opciones)
+    os.replace(tmp, destino)
+
+
+# (ruta, variante, formato) -> ((mtime, tamaño), ruta derivada) ya resueltos
+# en este proceso
+_memo = {}
+
+
+# Ruta de la versión optimizada de una imagen; si no se puede generar se
+# devuelve la original
+def derivada(ruta, variante, formato="JPEG"):
+    try:
+        estado = os.stat(ruta)
+    except OSError:
+        return ruta
+    firma = (estado.st_mtime_ns, estado.st_size)
+
+    en_memo = _memo.get((ruta, variante, formato))
+    if en_memo is not None and en_memo[0] == firma:
+        return en_memo[1]
+
+    try:
+        _, extension, _ = _formato(formato)
+        destino = os.path.join(DIRECTORIO_DERIVADAS, variante, _huella(ruta, variante, formato) + extension)
+        if not os.path.exists(destino):
+            _generar(ruta, destino, variante, formato)
+    except OSError:
+        return ruta
+
+    _memo[(ruta, variante, formato)] = (firma, destino)
+    return destino
+
+
+# === Manifiesto de imágenes ===
+
+class Archivo(NamedTuple):
+    ruta: str
+    bytes: int
+    ancho: int | None  # None si el archivo no se puede abrir como imagen
+    alto: int | None
+
+
+# Los nombres se comparan en NFC: un archivo copiado desde macOS puede venir
+# con las tildes descompuestas ("Crepu\u0301sculo.jpg")
+def _nombre(nombre):
+    return unicodedata.normalize("NFC", nombre)
+
+
+# directorio -> (mtime del directorio, manifiesto)
+_manifiestos = {}
+
+
+# Nombre de archivo -> Archivo de todo lo que hay en el directorio. Se arma
+# una vez por proceso (Pillow solo lee el encabezado para las dimensiones) y
+# se vuelve a armar si se agregan, quitan o renombran archivos
+def manifiesto(directorio=DIRECTORIO_IMAGENES):
+    try:
+        firma = os.stat(directorio).st_mtime_ns
+    except OSError:
+        return {}
+
+    en_memo = _manifiestos.get(directorio)
+    if en_memo is not None and en_memo[0] == firma:
+        return en_memo[1]
+
+    archivos = {}
+    with os.scandir(directorio) as entradas:
+        for entrada in entradas:
+            if not entrada.is_file():
+                continue
+            ancho = alto = None
+            try:
+                with Image.open(entrada.path) as img:
+                    ancho, alto = img.size
+            except OSError:
+                pass  # no es una imagen: queda en el manifiesto sin dimensiones
+            archivos[_nombre(entrada.name)] = Archivo(entrada.path, entrada.stat().st_size, ancho, alto)
+
+    archivos = dict(sorted(archivos.items()))
+    _manifiestos[directorio] = (firma, archivos)
+    return archivos
+
+
+# Ruta de una imagen del directorio, o None si no está
+def ruta_imagen(nombre, directorio=DIRECTORIO_IMAGENES):
+    archivo = manifiesto(directorio).get(_nombre(nombre))
+    return archivo.ruta if archivo is not None and archivo.ancho is not None else None
+
+
+# === Recursos en línea (logo y marca) ===
+
+# Data URI PNG de una imagen de marca (para <img src=...>), calculado una
+# vez por proceso. `ancho` reduce la imagen (usar ~2x el ancho en pantalla) y `colores`
+# la cuantiza a una paleta, lo que achica mucho el PNG resultante
+@lru_cache(maxsize=None)
+def en_linea(ruta, ancho=None, colores=None):
+    with Image.open(ruta) as img:
+        img = img.convert("RGBA")
+        if ancho and img.width > ancho:
+            img = img.resize((ancho, round(img.height * ancho / img.width)), Image.LANCZOS)
+        if colores:
+            img = img.quantize(colors=colores, method=Image.Quantize.FASTOCTREE)
+        buffer = BytesIO()
+        img.save(buffer, format="PNG", optimize=True)
+
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+# === Generación por lotes ===
+
+# Genera de antemano todas las derivadas de imagenes/
+def generar_todas(variantes=None, formatos=("JPEG",), hilos=None):
+    variantes = list(variantes or VARIANTES)
+    rutas = [
+        archivo.ruta
+        for nombre, archivo in manifiesto().items()
+        if nombre.lower().endswith((".jpg", ".jpeg"))
+    ]
+    trabajos = [
+        (ruta, variante, formato)
+        for ruta in rutas for variante in variantes for formato in formatos
+    ]
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        return list(pool.map(lambda t: derivada(*t), trabajos))
+
+
+if __name__ == "__main__":
+    generadas = generar_todas(sys.argv[1:] or None)
+    print(f"{len(generadas)} derivadas en {DIRECTORIO_DERIVADAS}")
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+# === Unidades de los ingredientes ===
+
+# Valores de la columna "unidad" de la hoja ingrediente. Los ingredientes que
+# no figuran en la hoja se tratan como líquidos (ml u oz)
+LIQUIDO = "líquido"
+
+# Unidad -> (línea en la receta, línea en la lista de compras)
+# Los líquidos de la lista de compras se arman aparte (llevan envase)
+PLANTILLAS = {
+    LIQUIDO: ("{cantidad} {unidad} de {nombre}", None),
+    "a gusto": ("Agregar {nombre} a gusto", "{nombre} (a gusto)"),
+    "gotas": ("Algunas gotas de {nombre}", "{nombre} (unas gotas por cóctel)"),
+    "unidades": ("{cantidad} {nombre}", "{cantidad} {nombre}"),
+    "cucharaditas": ("{cantidad} cucharadita(s) de {nombre}", "{cantidad} cucharadita(s) de {nombre}"),
+    "cucharadas": ("{cantidad} cucharada(s) de {nombre}", "{cantidad} cucharada(s) de {nombre}"),
+    "tazas": ("{cantidad} taza(s) de {nombre}", "{cantidad} taza(s) de {nombre}"),
+    "gramos": ("{cantidad} g de {nombre}", "{cantidad} g de {nombre}"),
+}
+
+
+# === Registro compilado desde la hoja ingrediente ===
+
+class RegistroIngredientes:
+    # hoja: columnas ingrediente, unidad, nombre, envase_ml
+    # ingredientes: columnas de ingredientes de la hoja receta, en orden
+    def __init__(self, hoja, ingredientes):
+        self.ingredientes = list(ingredientes)
+
+        hoja = hoja.dropna(subset=["ingrediente"]).drop_duplicates("ingrediente")
+        hoja = hoja.set_index("ingrediente")
+        self.sin_registro = [ing for ing in self.ingredientes if ing not in hoja.index]
+        hoja = hoja.reindex(self.ingredientes)
+
+        unidades = hoja["unidad"].fillna(LIQUIDO).astype(str).str.strip().str.lower()
+        self.unidades_desconocidas = sorted(set(unidades) - set(PLANTILLAS))
+
+        # Arreglos alineados con las columnas de ingredientes de la matriz
+        self.categorias = np.array(
+            [u if u in PLANTILLAS else LIQUIDO for u in unidades], dtype=object
+        )
+        self.nombres = np.array(
+            [n if pd.notna(n) else ing for ing, n in zip(self.ingredientes, hoja["nombre"])],
+            dtype=object,
+        )
+        self.envases = hoja["envase_ml"].to_numpy(dtype=float)  # NaN: sin envase
+
+        for arreglo in (self.categorias, self.nombres, self.envases):
+            arreglo.setflags(write=False)
@@ -0,0 +1,125 @@
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# === Tiempos por tramo de cada rerun ===
+
+# app.py marca el inicio de cada etapa (carga de datos, pasos del filtro,
+# escalado, secciones de la vista); cada marca cierra la anterior. Al final
+# del rerun los tramos se acumulan en histogramas con formato Prometheus y se
+# registran como una línea JSON en el logger "metricas".
+
+log = logging.getLogger("metricas")
+
+# Límites (segundos) de los histogramas, como los de un cliente Prometheus
+LIMITES = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Un rerun más lento que esto se registra como advertencia
+UMBRAL_LENTO = 1.0
+
+# Si está definida, la exposición Prometheus se escribe en este archivo al
+# terminar cada rerun (para el textfile collector de node_exporter)
+ARCHIVO_METRICAS = os.environ.get("CLUB_METRICAS_ARCHIVO")
+
+
+class Histograma:
+    def __init__(self):
+        self.cubetas = [0] * (len(LIMITES) + 1)  # la última es +Inf
+        self.suma = 0.0
+        self.cuenta = 0
+
+    def observar(self, segundos):
+        self.cubetas[bisect_left(LIMITES, segundos)] += 1
+        self.suma += segundos
+        self.cuenta += 1
+
+
+# Histogramas del proceso, compartidos por todas las sesiones
+_histogramas = {}
+_lock = threading.Lock()
+
+
+def observar(nombre, segundos):
+    with _lock:
+        _histogramas.setdefault(nombre, Histograma()).observar(segundos)
+
+
+def _etiqueta(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Texto en formato de exposición de Prometheus
+def texto_prometheus():
+    lineas = [
+        "# HELP club_tramo_segundos Duración de cada tramo de un rerun o consulta.",
+        "# TYPE club_tramo_segundos histogram",
+    ]
+    with _lock:
+        copia = {n: (list(h.cubetas), h.suma, h.cuenta) for n, h in sorted(_histogramas.items())}
+    for nombre, (cubetas, suma, cuenta) in copia.items():
+        tramo = _etiqueta(nombre)
+        acumulado = 0
+        for limite, n in zip((*LIMITES, "+Inf"), cubetas):
+            acumulado += n
+            lineas.append(f'club_tramo_segundos_bucket{{tramo="{tramo}",le="{limite}"}} {acumulado}')
+        lineas.append(f'club_tramo_segundos_sum{{tramo="{tramo}"}} {suma:.6f}')
+        lineas.append(f'club_tramo_segundos_count{{tramo="{tramo}"}} {cuenta}')
+    return "\n".join(lineas) + "\n"
+
+
+def _escribir_archivo(ruta):
+    tmp = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(texto_prometheus())
+        os.replace(tmp, ruta)
+    except OSError:
+        log.exception("No se pudo escribir %s", ruta)
+
+
+# === Medición de un rerun ===
+
+class Medicion:
+    def __init__(self, nombre="rerun"):
+        self.nombre = nombre
+        self.tramos = []            # (tramo, segundos), en orden
+        self.cerrada = False
+        self._inicio = time.perf_counter()
+        self._tramo = None
+        self._desde = self._inicio
+
+    # Cierra el tramo en curso y abre uno nuevo
+    def marca(self, tramo):
+        ahora = time.perf_counter()
+        if self._tramo is not None:
+            self.tramos.append((self._tramo, ahora - self._desde))
+        self._tramo, self._desde = tramo, ahora
+
+    @property
+    def total(self):
+        return sum(segundos for _, segundos in self.tramos)
+
+    # Cierra el último tramo y publica la medición (una sola vez)
+    def cerrar(self):
+        if self.cerrada:
+            return
+        self.marca(None)
+        self.cerrada = True
+
+        for tramo, segundos in self.tramos:
+            observar(f"{self.nombre}/{tramo}", segundos)
+        observar(self.nombre, self.total)
+
+        nivel = logging.WARNING if self.total > UMBRAL_LENTO else logging.INFO
+        if log.isEnabledFor(nivel):
+            log.log(nivel, json.dumps({
+                "evento": self.nombre,
+                "total_ms": round(self.total * 1000, 2),
+                "tramos_ms": {t: round(s * 1000, 2) for t, s in self.tramos},
+            }, ensure_ascii=False))
+
+        if ARCHIVO_METRICAS:
+            _escribir_archivo(ARCHIVO_METRICAS)
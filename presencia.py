@@ -0,0 +1,187 @@
+import os
+
+import numpy as np
+
+# === Columnas de la hoja receta ===
+
+# Columnas de metadatos; todas las demás son ingredientes
+COLUMNAS_METADATOS = (
+    "coctel", "vaso", "tecnica", "capacidad_vaso_sin_hielo", "cantidad_hielo",
+    "hielo", "capacidad_vaso_con_hielo", "volumen",
+)
+
+# Los licores son las columnas de ingredientes anteriores a esta (se busca
+# por nombre: agregar columnas no corre el límite)
+PRIMER_INGREDIENTE_SIN_ALCOHOL = "Jugo de Limón"
+
+
+# === Cantidades cóctel × ingrediente ===
+
+# La hoja receta es una matriz ancha casi toda en cero. Al cargarla se
+# guarda en formato largo: una entrada (fila del cóctel, id del ingrediente,
+# cantidad) por cada valor no nulo, ordenadas por cóctel e ingrediente, con
+# los nombres codificados como enteros y las cantidades en float32. Dos
+# índices (por cóctel y por ingrediente) permiten que las búsquedas y los
+# filtros lean solo las entradas que les tocan.
+ENTRADA = [("coctel", np.int32), ("ingrediente", np.int16), ("cantidad", np.float32)]
+
+
+class MatrizPresencia:
+    def __init__(self, recetas):
+        columnas = [c for c in recetas.columns if c not in COLUMNAS_METADATOS]
+
+        self.cocteles = recetas["coctel"].to_numpy()
+        self.ingredientes = list(columnas)
+        if PRIMER_INGREDIENTE_SIN_ALCOHOL in self.ingredientes:
+            self.licores = self.ingredientes[:self.ingredientes.index(PRIMER_INGREDIENTE_SIN_ALCOHOL)]
+        else:
+            self.licores = []
+        self._posicion = {ing: i for i, ing in enumerate(self.ingredientes)}
+
+        # Fila de cada cóctel (la primera, si estuviera repetido)
+        self.fila = {}
+        for i, coctel in enumerate(self.cocteles):
+            self.fila.setdefault(coctel, i)
+
+        # Filas ordenadas por nombre del cóctel, para listar sin volver a ordenar
+        con_nombre = [i for i, coctel in enumerate(self.cocteles) if isinstance(coctel, str)]
+        self.orden = np.array(sorted(con_nombre, key=lambda i: self.cocteles[i]), dtype=int)
+        self.orden.setflags(write=False)
+
+        # Máscara sin filtros, compartida (de solo lectura)
+        self.todos = np.ones(len(self.cocteles), dtype=bool)
+        self.todos.setflags(write=False)
+
+        # Formato largo, columna por columna (sin armar la matriz densa)
+        tipo = np.dtype(ENTRADA if len(columnas) <= np.iinfo(np.int16).max else [
+            (nombre, np.int32 if nombre == "ingrediente" else t) for nombre, t in ENTRADA
+        ])
+        partes = [np.empty(0, dtype=tipo)]
+        for j, columna in enumerate(columnas):
+            valores = recetas[columna].to_numpy(dtype=np.float32, na_value=0)
+            filas = np.flatnonzero(valores)
+            parte = np.empty(len(filas), dtype=tipo)
+            parte["coctel"], parte["ingrediente"], parte["cantidad"] = filas, j, valores[filas]
+            partes.append(parte)
+        tabla = np.concatenate(partes)
+        self.tabla = tabla[np.lexsort((tabla["ingrediente"], tabla["coctel"]))]
+        self._archivo = None
+        self._indexar()
+
+    # Índices sobre la tabla: inicio[i]:inicio[i + 1] son las entradas de la
+    # fila i, y _filas[_desde[j]:_desde[j + 1]] las filas que llevan el
+    # ingrediente j
+    def _indexar(self):
+        coctel = self.tabla["coctel"]
+        self.inicio = np.searchsorted(coctel, np.arange(len(self.cocteles) + 1)).astype(np.int32)
+
+        presentes = np.flatnonzero(self.tabla["cantidad"] > 0)
+        ingrediente = self.tabla["ingrediente"][presentes]
+        orden = np.argsort(ingrediente, kind="stable")
+        self._filas = coctel[presentes[orden]].astype(np.int32)
+        self._desde = np.searchsorted(ingrediente[orden], np.arange(len(self.ingredientes) + 1)).astype(np.int32)
+
+        # Cócteles sin ningún licor
+        self.sin_alcohol = ~self.contiene_alguno(self.licores)
+
+        for arreglo in (self.inicio, self._filas, self._desde, self.sin_alcohol):
+            arreglo.setflags(write=False)
+
+    # Filas de los cócteles que llevan el ingrediente j
+    def filas_con(self, j):
+        return self._filas[self._desde[j]:self._desde[j + 1]]
+
+    def _ids(self, ingredientes):
+        return [self._posicion[ing] for ing in ingredientes]
+
+    def _mascara(self, filas):
+        mascara = np.zeros(len(self.cocteles), dtype=bool)
+        mascara[filas] = True
+        return mascara
+
+    # Máscara de los cócteles que llevan todos los ingredientes indicados
+    # (ej: contiene("Gin", "Vermouth Rosso"))
+    def contiene(self, *ingredientes):
+        mascara = self.todos.copy()
+        for j in self._ids(ingredientes):
+            mascara &= self._mascara(self.filas_con(j))
+        return mascara
+
+    # Máscara de los cócteles que llevan al menos uno de los ingredientes
+    def contiene_alguno(self, ingredientes):
+        filas = [self.filas_con(j) for j in self._ids(ingredientes)]
+        return self._mascara(np.concatenate(filas) if filas else [])
+
+    # Ingredientes (de entre `ingredientes`) usados por al menos un cóctel
+    # de la máscara
+    def disponibles(self, mascara, ingredientes=None):
+        ingredientes = self.ingredientes if ingredientes is None else list(ingredientes)
+        return [ing for ing in ingredientes if mascara[self.filas_con(self._posicion[ing])].any()]
+
+    # Entradas de varias filas, en el orden pedido: (posición de la fila en
+    # `filas`, id del ingrediente, cantidad)
+    def entradas(self, filas):
+        filas = np.asarray(filas, dtype=int)
+        desde, hasta = self.inicio[filas], self.inicio[filas + 1]
+        largos = hasta - desde
+        pedido = np.repeat(np.arange(len(filas)), largos)
+        posiciones = np.repeat(desde - np.cumsum(largos) + largos, largos) + np.arange(largos.sum())
+        entradas = self.tabla[posiciones]
+        return pedido, entradas["ingrediente"].astype(int), entradas["cantidad"]
+
+    # Cantidad de un ingrediente en un cóctel (0 si no lo lleva)
+    def cantidad(self, coctel, ingrediente):
+        i, j = self.fila.get(coctel), self._posicion.get(ingrediente)
+        if i is None or j is None:
+            return 0.0
+        entradas = self.tabla[self.inicio[i]:self.inicio[i + 1]]
+        k = np.searchsorted(entradas["ingrediente"], j)
+        return float(entradas["cantidad"][k]) if k < len(entradas) and entradas["ingrediente"][k] == j else 0.0
+
+    # Matriz densa cóctel × ingrediente; solo para cálculos de carga que la
+    # necesitan entera (ver similares.py)
+    def densa(self):
+        cantidades = np.zeros((len(self.cocteles), len(self.ingredientes)), dtype=np.float32)
+        cantidades[self.tabla["coctel"], self.tabla["ingrediente"]] = self.tabla["cantidad"]
+        return cantidades
+
+    @property
+    def nbytes(self):
+        return self.tabla.nbytes + self.inicio.nbytes + self._filas.nbytes + self._desde.nbytes
+
+    # === Almacenamiento en disco ===
+
+    # La tabla se guarda en un .npy junto al artefacto compilado (ver datos.py)
+    # y se abre con mmap: no se copia a la memoria de cada proceso y los
+    # workers del servidor comparten las mismas páginas
+    def guardar(self, ruta):
+        if self._archivo == ruta:
+            return
+        tmp = f"{ruta}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, np.asarray(self.tabla))
+        os.replace(tmp, ruta)
+        self._abrir(ruta)
+
+    def _abrir(self, ruta):
+        self.tabla = np.load(ruta, mmap_mode="r")
+        self._archivo = ruta
+
+    def __getstate__(self):
+        estado = dict(vars(self))
+        if self._archivo is not None:
+            estado["tabla"] = None  # se vuelve a abrir desde el .npy
+        return estado
+
+    def __setstate__(self, estado):
+        vars(self).update(estado)
+        if self.tabla is None:
+            self._abrir(self._archivo)
+
+    # Misma tabla y mismos nombres (para reutilizarla al recargar el libro)
+    def igual(self, otra):
+        return (
+            self.ingredientes == otra.ingredientes
+            and np.array_equal(self.cocteles, otra.cocteles)
+            and np.array_equal(self.tabla, otra.tabla)
+        )
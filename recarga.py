@@ -0,0 +1,139 @@
+import logging
+import threading
+
+import datos as modulo_datos
+from arranque import precalentar_cocteles
+from datos import RUTA_RECETAS, cargar_datos, firma_archivo, recargar
+from detalle import detalle, invalidar
+from imagenes import DIRECTORIO_IMAGENES, manifiesto
+
+# === Recarga en caliente del libro ===
+
+# Un hilo por proceso revisa cada INTERVALO segundos la fecha y el tamaño del
+# libro y la fecha de la carpeta de imágenes. Cuando el libro cambia (y dejó
+# de cambiar: un guardado puede escribir el archivo en varios pasos) se vuelve
+# a cargar en segundo plano con datos.recargar, que solo lee las hojas que
+# cambiaron y reutiliza lo que no depende de ellas. La versión nueva reemplaza
+# a la anterior de una vez; las sesiones la ven en su próximo rerun, sin
+# reiniciar el servidor. Después se precalienta el detalle y las derivadas
+# solo de los cócteles que cambiaron (ver Datos.versiones).
+#
+# Se revisa con un intervalo en vez de usar watchdog (que Streamlit ya
+# instala): así funciona igual en carpetas montadas por red o en volúmenes de
+# contenedores, donde los eventos del sistema de archivos no siempre llegan, y
+# la espera a que el archivo deje de cambiar sale sola.
+
+log = logging.getLogger("recarga")
+
+# Segundos entre revisiones
+INTERVALO = 2.0
+
+
+# Cócteles cuya versión cambió entre dos Datos (incluye los agregados y
+# los eliminados)
+def cocteles_cambiados(anterior, actual):
+    return sorted(
+        coctel for coctel in anterior.versiones.keys() | actual.versiones.keys()
+        if anterior.versiones.get(coctel) != actual.versiones.get(coctel)
+    )
+
+
+class Vigilante(threading.Thread):
+    def __init__(self, ruta=RUTA_RECETAS, intervalo=INTERVALO):
+        super().__init__(name=f"recarga-{ruta}", daemon=True)
+        self.ruta = ruta
+        self.intervalo = intervalo
+        self._detenido = threading.Event()
+        # ruta -> (firma ya procesada, última firma vista)
+        self._firmas = {
+            ruta: (firma_archivo(ruta),) * 2,
+            DIRECTORIO_IMAGENES: (firma_archivo(DIRECTORIO_IMAGENES),) * 2,
+        }
+        self._manifiesto = manifiesto()
+
+    # True si la ruta cambió desde la última vez que se procesó y su firma es
+    # la misma que en la revisión anterior (ya terminó de escribirse)
+    def _cambio(self, ruta, firma):
+        procesada, vista = self._firmas[ruta]
+        if firma == procesada:
+            self._firmas[ruta] = (procesada, firma)
+            return False
+        if firma != vista:
+            self._firmas[ruta] = (procesada, firma)
+            return False
+        self._firmas[ruta] = (firma, firma)
+        return True
+
+    def run(self):
+        while not self._detenido.wait(self.intervalo):
+            try:
+                self.revisar()
+            except Exception:
+                log.exception("Error al revisar %s", self.ruta)
+
+    def detener(self):
+        self._detenido.set()
+        with _lock:
+            if _vigilantes.get(self.ruta) is self:
+                del _vigilantes[self.ruta]
+                modulo_datos.vigilados.discard(self.ruta)
+
+    def revisar(self):
+        if self._cambio(self.ruta, firma_archivo(self.ruta)):
+            self._recargar_libro()
+        # La fecha de una carpeta cambia al agregar, quitar o renombrar archivos
+        if self._cambio(DIRECTORIO_IMAGENES, firma_archivo(DIRECTORIO_IMAGENES)):
+            self._recargar_imagenes()
+
+    def _recargar_libro(self):
+        try:
+            anterior, actual = recargar(self.ruta)
+        except Exception:
+            # Libro a medio guardar o dañado: se sigue sirviendo la versión anterior
+            log.exception("No se pudo recargar %s; se mantiene la versión anterior", self.ruta)
+            return
+        if anterior is None or actual is anterior:
+            return
+
+        cambiados = cocteles_cambiados(anterior, actual)
+        log.info("%s recargado: %d cóctel(es) cambiaron", self.ruta, len(cambiados))
+        invalidar(set(cambiados))
+        precalentar_cocteles(actual, [c for c in cambiados if c in actual.versiones])
+
+    def _recargar_imagenes(self):
+        anterior, self._manifiesto = self._manifiesto, manifiesto()
+        nombres = {
+            nombre for nombre in anterior.keys() | self._manifiesto.keys()
+            if anterior.get(nombre) != self._manifiesto.get(nombre)
+        }
+        if not nombres:
+            return
+
+        datos = cargar_datos(self.ruta)
+        afectados = []
+        for coctel in datos.versiones:
+            recursos = detalle(datos, coctel).recursos
+            if f"{coctel}.jpg" in nombres or (recursos is not None and recursos.imagen in nombres):
+                afectados.append(coctel)
+        log.info("%s: %d imagen(es) cambiaron, %d cóctel(es) afectados", DIRECTORIO_IMAGENES, len(nombres), len(afectados))
+        invalidar(set(afectados))
+        precalentar_cocteles(datos, afectados)
+
+
+# ruta -> Vigilante del proceso
+_vigilantes = {}
+_lock = threading.Lock()
+
+
+# Empieza a vigilar el libro (una sola vez por proceso); desde entonces
+# cargar_datos devuelve la versión en memoria sin revisar el archivo
+def iniciar(ruta=RUTA_RECETAS, intervalo=INTERVALO):
+    with _lock:
+        vigilante = _vigilantes.get(ruta)
+        if vigilante is None:
+            cargar_datos(ruta)
+            vigilante = Vigilante(ruta, intervalo)
+            vigilante.start()
+            _vigilantes[ruta] = vigilante
+            modulo_datos.vigilados.add(ruta)
+        return vigilante
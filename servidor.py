@@ -0,0 +1,14 @@
+import streamlit as st
+
+from arranque import ciclo_de_vida
+
+# === Servidor de la app con precalentamiento ===
+
+# Sirve app.py igual que `streamlit run app.py`, pero el proceso precalienta
+# los datos, el manifiesto de imágenes y las derivadas antes de aceptar la
+# primera conexión (ver arranque.py), y después recarga el libro en caliente
+# cuando cambia (ver recarga.py). Correr con:
+#   streamlit run servidor.py
+
+
+app = st.App("app.py", lifespan=ciclo_de_vida)
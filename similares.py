@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+from ingredientes import LIQUIDO
+
+# === Cócteles similares ===
+
+# Cada cóctel se describe con un vector: la proporción de cada líquido en el
+# volumen total, una marca para los demás ingredientes (hojas, frutas, gotas)
+# y la técnica, el vaso y el hielo. La similitud es el coseno entre vectores.
+# Los vecinos se calculan una vez al cargar los datos; mostrar los similares
+# de un cóctel es solo una búsqueda en un diccionario.
+
+# Vecinos que se guardan por cóctel, y similitud mínima para mostrarlos
+VECINOS = 5
+SIMILITUD_MINIMA = 0.2
+
+# Peso de cada grupo de rasgos frente a las proporciones de los líquidos
+PESO_OTROS_INGREDIENTES = 0.1
+PESOS_METADATOS = {"tecnica": 0.15, "vaso": 0.1, "hielo": 0.1}
+
+# Filas que se comparan a la vez (acota la memoria con catálogos grandes)
+BLOQUE = 1024
+
+
+def _vectores(recetas, matriz, registro):
+    volumen = recetas["volumen"].to_numpy(dtype=float)
+    volumen = np.where(volumen > 0, volumen, np.nan)
+
+    # Se compara todo el catálogo contra sí mismo: aquí sí hace falta la matriz
+    # densa, que existe solo mientras se calculan los vecinos
+    cantidades = matriz.densa()
+    es_liquido = registro.categorias == LIQUIDO
+    liquidos = np.nan_to_num(cantidades[:, es_liquido] / volumen[:, None])
+    otros = (cantidades[:, ~es_liquido] > 0) * PESO_OTROS_INGREDIENTES
+
+    partes = [liquidos, otros]
+    for columna, peso in PESOS_METADATOS.items():
+        categorias = pd.get_dummies(recetas[columna].astype(str).str.strip().str.lower())
+        partes.append(categorias.to_numpy(dtype=float) * peso)
+
+    vectores = np.hstack(partes)
+    normas = np.linalg.norm(vectores, axis=1, keepdims=True)
+    return vectores / np.where(normas > 0, normas, 1)
+
+
+# Coctel -> ((coctel similar, similitud), ...), del más al menos parecido
+def calcular_similares(recetas, matriz, registro, k=VECINOS):
+    vectores = _vectores(recetas, matriz, registro)
+    cocteles = matriz.cocteles
+    validos = np.array([isinstance(c, str) for c in cocteles])
+    k = min(k, int(validos.sum()) - 1)
+
+    similares = {}
+    if k <= 0:
+        return similares
+    for inicio in range(0, len(vectores), BLOQUE):
+        bloque = vectores[inicio:inicio + BLOQUE] @ vectores.T
+        for i, fila in enumerate(bloque, start=inicio):
+            coctel = cocteles[i]
+            if not validos[i] or coctel in similares:
+                continue
+            fila = np.where(validos & (cocteles != coctel), fila, -np.inf)
+            # Los k mayores sin ordenar todo el catálogo; empates por nombre
+            candidatos = np.argpartition(-fila, k)[:k + 1] if len(fila) > k + 1 else np.arange(len(fila))
+            candidatos = sorted(
+                (j for j in candidatos if fila[j] >= SIMILITUD_MINIMA),
+                key=lambda j: (-fila[j], cocteles[j]),
+            )
+            vecinos = []
+            for j in candidatos:
+                if cocteles[j] not in (c for c, _ in vecinos):
+                    vecinos.append((cocteles[j], round(float(fila[j]), 3)))
+            similares[coctel] = tuple(vecinos[:k])
+    return similares
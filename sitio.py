@@ -0,0 +1,287 @@
+import html
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from busqueda import normalizar
+from datos import cargar_datos
+from detalle import detalle
+from escalado import UNIDADES, escalar
+from imagenes import derivada, en_linea
+from ingredientes import LIQUIDO, PLANTILLAS
+
+# === Sitio estático ===
+
+# Genera una página HTML por cóctel (1 cóctel, en ml y oz) más un índice con
+# búsqueda. El escalado y la búsqueda corren en el navegador (estatico/sitio.js),
+# así que el sitio se puede servir desde nginx o un CDN sin Python.
+# Uso: python sitio.py [directorio de salida]
+
+DIRECTORIO_SALIDA = "sitio"
+DIRECTORIO_ESTATICO = "estatico"
+
+# Formatos de las imágenes del sitio: el navegador elige el primero que
+# soporta (<picture>); JPEG va siempre como respaldo
+FORMATOS_IMAGEN = ("WEBP", "JPEG")
+
+TIPOS_IMAGEN = {".webp": "image/webp", ".avif": "image/avif", ".jpg": "image/jpeg"}
+
+
+# === Formato del texto ===
+
+# Nombre de archivo de un cóctel: "Piña Colada" -> "pina-colada"
+def slug(coctel):
+    return re.sub(r"[^a-z0-9]+", "-", normalizar(coctel)).strip("-") or "coctel"
+
+
+def _e(texto):
+    return html.escape(str(texto))
+
+
+# Markdown mínimo de los textos del libro: **negrita**, *cursiva* y párrafos
+def _markdown(texto):
+    texto = _e(texto)
+    texto = re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", texto)
+    texto = re.sub(r"\*(.+?)\*", r"<em>\1</em>", texto)
+    parrafos = [p.strip() for p in re.split(r"\n\s*\n", texto) if p.strip()]
+    return "\n".join(f"<p>{p.replace(chr(10), '<br>')}</p>" for p in parrafos)
+
+
+def _lista(lineas, id_lista=None):
+    atributo = f' id="{id_lista}"' if id_lista else ""
+    items = "".join(f"<li>{_e(l)}</li>" for l in lineas)
+    return f"<ul{atributo}>{items}</ul>"
+
+
+# === Imágenes ===
+
+# Copia las derivadas de una imagen al sitio y devuelve el <picture>.
+# Los nombres de las derivadas dependen del contenido, así que se pueden
+# servir con caché permanente.
+def _imagen(ruta, variante, salida, alt, ancho=None):
+    fuentes = []
+    for formato in FORMATOS_IMAGEN:
+        origen = derivada(ruta, variante, formato)
+        nombre = os.path.basename(origen)
+        destino = os.path.join(salida, "img", nombre)
+        if not os.path.exists(destino):
+            tmp = f"{destino}.{threading.get_ident()}.tmp"
+            shutil.copyfile(origen, tmp)
+            os.replace(tmp, destino)
+        if f"../img/{nombre}" not in fuentes:
+            fuentes.append(f"../img/{nombre}")
+
+    *alternativas, respaldo = fuentes
+    source = "".join(
+        f'<source srcset="{_e(f)}" type="{TIPOS_IMAGEN[os.path.splitext(f)[1]]}">'
+        for f in alternativas if os.path.splitext(f)[1] in TIPOS_IMAGEN
+    )
+    ancho = f' width="{ancho}"' if ancho else ""
+    return f'<picture>{source}<img src="{_e(respaldo)}" alt="{_e(alt)}"{ancho} loading="lazy"></picture>'
+
+
+# === Páginas ===
+
+def _pagina(titulo, cuerpo, logo, raiz=""):
+    return f"""<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{_e(titulo)}</title>
+<link rel="icon" href="{raiz}favicon.ico">
+<link rel="stylesheet" href="{raiz}sitio.css">
+<script src="{raiz}sitio.js" defer></script>
+</head>
+<body>
+<header>
+<a href="{raiz}index.html"><img src="{logo}" width="90" alt="Club de Licores"></a>
+<h1><a href="{raiz}index.html">Club de Licores</a></h1>
+</header>
+{cuerpo}
+<footer>
+<i>Aplicación desarrollada por <b>Carlos Andrés González Miranda</b><br>
+Contacto: clubdelicores@gmail.com<br>
+Santiago de Chile, 2025</i>
+</footer>
+</body>
+</html>
+"""
+
+
+# Datos que necesita sitio.js para escalar la receta en el navegador
+def _datos_receta(datos, coctel):
+    base = escalar(datos, [(coctel, 1, None)], "ml")
+    fila = datos.receta(coctel)
+    return {
+        "volumen": float(fila["volumen"]),
+        "liquido": LIQUIDO,
+        "unidades": UNIDADES,
+        "plantillas": {cat: plantillas[0] for cat, plantillas in PLANTILLAS.items()},
+        "ingredientes": [
+            {"categoria": f.categoria, "nombre": f.nombre, "ml": float(f.ml)}
+            for f in base.itertuples(index=False)
+        ],
+    }
+
+
+def _recursos(recursos, salida):
+    partes = [
+        "<hr>",
+        '<h2 class="recursos">Recursos adicionales</h2>',
+    ]
+    if recursos.imagen is not None:
+        if recursos.imagen_ruta:
+            partes.append(_imagen(recursos.imagen_ruta, "recurso", salida, recursos.imagen))
+        if recursos.imagen_texto:
+            partes.append(f'<p class="texto">{_e(recursos.imagen_texto)}</p>')
+
+    if recursos.titulo is not None:
+        partes.append(f"<h3>{_e(recursos.titulo)}</h3>")
+        partes.append(f'<p class="texto">{_e(recursos.contenido)}</p>')
+
+    if recursos.enlace_otro:
+        url, texto = recursos.enlace_otro
+        partes.append("<h3>Déjate Sorprender</h3>")
+        partes.append(f'<p><a href="{_e(url)}" target="_blank" rel="noopener">📼 {_e(texto)}</a></p>')
+
+    for titulo, musica in [
+        ("Vamos a ponerte un tema", recursos.musica),
+        ("Vamos a ponerte otro tema", recursos.musica_2),
+    ]:
+        if musica:
+            url, texto, cita = musica
+            partes.append(f"<h3>{titulo}</h3>")
+            partes.append(f'<p><a href="{_e(url)}" target="_blank" rel="noopener">📀 {_e(texto)}</a></p>')
+            if cita is not None:
+                partes.append(
+                    "<blockquote><p>La canción se seleccionó porque este verso lo pide:</p>"
+                    f"<p><em>{_e(cita)}</em></p></blockquote>"
+                )
+    return "\n".join(partes)
+
+
+def pagina_coctel(datos, coctel, salida, logo):
+    info = detalle(datos, coctel)
+    lineas_ml = escalar(datos, [(coctel, 1, None)], "ml")["linea"]
+    lineas_oz = escalar(datos, [(coctel, 1, None)], "oz")["linea"]
+    receta = json.dumps(_datos_receta(datos, coctel), ensure_ascii=False).replace("</", "<\\/")
+
+    partes = [f'<h2 class="coctel">{_e(coctel)}</h2>']
+    if info.imagen:
+        partes.append(_imagen(info.imagen, "tarjeta", salida, coctel, ancho=400))
+    else:
+        partes.append("<p>Imagen no disponible para este cóctel.</p>")
+
+    opciones_unidad = "".join(f'<option value="{u}">{u}</option>' for u in UNIDADES)
+    partes += [
+        "<h3>Ingredientes</h3>",
+        '<div class="controles">'
+        '<label>Cócteles <input id="cantidad" type="number" min="1" step="1" value="1"></label>'
+        '<label>o litros <input id="litros" type="number" min="0" step="0.1" placeholder="—"></label>'
+        f'<label>Unidad <select id="unidad">{opciones_unidad}</select></label>'
+        "</div>",
+        _lista(lineas_ml, "ingredientes"),
+        # Sin JavaScript queda la receta para 1 cóctel en las dos unidades
+        f"<noscript><p>En onzas (1 cóctel):</p>{_lista(lineas_oz)}</noscript>",
+        f'<script type="application/json" id="receta-datos">{receta}</script>',
+    ]
+
+    if info.preparacion is not None:
+        partes += ["<h3>Preparación</h3>", _markdown(f"🥄 {info.preparacion}")]
+    for jarabe, preparacion in info.jarabes:
+        partes += [f"<p><strong>💡 {_e(jarabe)}</strong></p>", _markdown(preparacion)]
+
+    partes += ["<h3>Técnica</h3>", _markdown(info.tecnica)]
+    partes += ["<h3>Hielo</h3>", f"<p>{'❄️ Servir con hielo.' if info.con_hielo else '🚫 Servir sin hielo.'}</p>"]
+    partes += ["<h3>Cristalería sugerida</h3>", f"<p>{_e(info.cristaleria)}</p>"]
+    if info.garnitura:
+        partes += ["<h3>Garnitura (garnish)</h3>", f"<p>🍋‍🟩 Acompañar con: {_e(', '.join(info.garnitura))}</p>"]
+    if info.observaciones is not None:
+        partes += ["<h3>Observaciones</h3>", _markdown(f"📝 {info.observaciones}")]
+    if info.similares:
+        enlaces = "".join(
+            f'<li><a href="{slug(similar)}.html">{_e(similar)}</a></li>' for similar, _ in info.similares
+        )
+        partes += ["<h3>Cócteles similares</h3>", f"<ul>{enlaces}</ul>"]
+    if info.recursos:
+        partes.append(_recursos(info.recursos, salida))
+
+    return _pagina(coctel, "\n".join(partes), logo, raiz="../")
+
+
+def pagina_indice(cocteles, logo):
+    items = "\n".join(
+        f'<li data-id="{i}"><a href="c/{slug(c)}.html">{_e(c)}</a></li>'
+        for i, c in enumerate(cocteles)
+    )
+    cuerpo = f"""<h2>Buscador de Cócteles</h2>
+<input id="buscar" type="search" placeholder="Palabra clave (ej: limón, menta)" data-indice="indice.json">
+<p><span id="contador">{len(cocteles)}</span> cócteles</p>
+<ul id="cocteles">
+{items}
+</ul>"""
+    return _pagina("Club de Licores", cuerpo, logo)
+
+
+# Índice de búsqueda para sitio.js: el vocabulario de datos.indice con los
+# cócteles de cada token como posiciones en la lista de la portada
+def indice_busqueda(datos, cocteles):
+    posicion = {c: i for i, c in enumerate(cocteles)}
+    return {
+        "tokens": datos.indice.tokens,
+        "cocteles": [
+            sorted(posicion[c] for c in grupo if c in posicion)
+            for grupo in datos.indice.cocteles
+        ],
+    }
+
+
+# === Construcción ===
+
+def _escribir(ruta, contenido):
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write(contenido)
+
+
+def construir(salida=DIRECTORIO_SALIDA, hilos=None):
+    datos = cargar_datos()
+    cocteles = sorted({c for c in datos.recetas["coctel"] if isinstance(c, str)})
+    logo = en_linea("imagenes/icon.png", ancho=180, colores=256)
+
+    # Dos cócteles con el mismo slug romperían los enlaces
+    slugs = {}
+    for coctel in cocteles:
+        otro = slugs.setdefault(slug(coctel), coctel)
+        if otro != coctel:
+            raise ValueError(f"'{coctel}' y '{otro}' generan el mismo archivo {slug(coctel)}.html")
+
+    os.makedirs(os.path.join(salida, "c"), exist_ok=True)
+    os.makedirs(os.path.join(salida, "img"), exist_ok=True)
+    for nombre in ("sitio.js", "sitio.css"):
+        shutil.copyfile(os.path.join(DIRECTORIO_ESTATICO, nombre), os.path.join(salida, nombre))
+    shutil.copyfile(os.path.join("imagenes", "favicon.ico"), os.path.join(salida, "favicon.ico"))
+
+    # Las derivadas se generan en paralelo (Pillow libera el GIL al recodificar)
+    def escribir_coctel(coctel):
+        _escribir(os.path.join(salida, "c", f"{slug(coctel)}.html"), pagina_coctel(datos, coctel, salida, logo))
+
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        list(pool.map(escribir_coctel, cocteles))
+
+    _escribir(os.path.join(salida, "index.html"), pagina_indice(cocteles, logo))
+    _escribir(
+        os.path.join(salida, "indice.json"),
+        json.dumps(indice_busqueda(datos, cocteles), ensure_ascii=False, separators=(",", ":")),
+    )
+    return cocteles
+
+
+if __name__ == "__main__":
+    salida = sys.argv[1] if len(sys.argv) > 1 else DIRECTORIO_SALIDA
+    cocteles = construir(salida)
+    print(f"{len(cocteles)} páginas en {salida}/")
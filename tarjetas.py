@@ -0,0 +1,317 @@
+import io
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import unicodedata
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageFont
+
+from datos import cargar_datos
+from detalle import detalle
+from escalado import MAXIMO_COCTELES, escalar
+from imagenes import derivada
+from sitio import slug
+
+# === Tarjetas de receta para imprimir ===
+
+# Una tarjeta por cóctel (A6 a 300 dpi) con los ingredientes escalados, la
+# preparación, la técnica, la cristalería, el hielo, la garnitura y la foto,
+# en PDF o PNG. Se dibujan en un pool de procesos y se entregan en un zip que
+# se va escribiendo a medida que salen las tarjetas (nunca están todas en
+# memoria). Uso:
+#   python tarjetas.py [--png] [--oz] [--cantidad N] salida.zip [cóctel ...]
+# Sin cócteles se exporta todo el catálogo
+
+FORMATOS = {"PDF": ".pdf", "PNG": ".png"}
+
+DPI = 300
+TAMANO = (1240, 1748)  # A6 vertical
+MARGEN = 90
+
+# Fuente TrueType para las tarjetas (ruta o nombre). Si no se indica se
+# busca una de FUENTES_SISTEMA; sin ninguna se usa la que trae Pillow, que no
+# tiene tildes ni eñes, y el texto se escribe sin ellas
+FUENTE = None
+FUENTES_SISTEMA = ("DejaVuSans.ttf", "LiberationSans-Regular.ttf", "Arial.ttf", "arial.ttf")
+TAMANOS_FUENTE = {"titulo": 76, "seccion": 40, "texto": 32, "pie": 24}
+
+COLOR_TITULO = "#e63118"
+COLOR_TEXTO = "#222222"
+COLOR_PIE = "#888888"
+
+# Tarjetas pedidas al pool por cada proceso antes de esperar a la primera:
+# acota la memoria aunque el zip se consuma más lento de lo que se dibuja
+EN_VUELO_POR_PROCESO = 2
+
+
+# === Dibujo ===
+
+# (fuente, True si tiene todos los caracteres del español)
+@lru_cache(maxsize=None)
+def _fuente(estilo):
+    tamano = TAMANOS_FUENTE[estilo]
+    for nombre in (FUENTE,) if FUENTE is not None else FUENTES_SISTEMA:
+        try:
+            return ImageFont.truetype(nombre, tamano), True
+        except OSError:
+            pass
+    return ImageFont.load_default(tamano), False
+
+
+# Texto sin tildes ni signos tipográficos, para la fuente de Pillow
+_SIGNOS = str.maketrans({"•": "-", "…": "...", "–": "-", "·": "-", "¿": "", "¡": ""})
+
+
+def _ascii(texto):
+    texto = unicodedata.normalize("NFKD", texto.translate(_SIGNOS))
+    return "".join(c for c in texto if c.isascii())
+
+
+# Quita el markdown mínimo de los textos del libro (**negrita**, *cursiva*)
+def _texto_plano(texto):
+    return re.sub(r"\*{1,2}(.+?)\*{1,2}", r"\1", str(texto)).strip()
+
+
+# Corta un texto en líneas que caben en `ancho` px (respeta los saltos de
+# línea). Cada palabra se mide una sola vez
+def _envolver(texto, fuente, ancho):
+    espacio = fuente.getlength(" ")
+    lineas = []
+    for parrafo in texto.split("\n"):
+        actual, largo = [], 0
+        for palabra in parrafo.split():
+            medida = fuente.getlength(palabra)
+            if actual and largo + espacio + medida > ancho:
+                lineas.append(" ".join(actual))
+                actual, largo = [], 0
+            largo += (espacio if actual else 0) + medida
+            actual.append(palabra)
+        lineas.append(" ".join(actual))
+    return lineas
+
+
+class _Lienzo:
+    def __init__(self):
+        self.imagen = Image.new("RGB", TAMANO, "white")
+        self.dibujo = ImageDraw.Draw(self.imagen)
+        self.y = MARGEN
+        self.ancho = TAMANO[0] - 2 * MARGEN
+        # Debajo de este límite va solo el pie
+        self.limite = TAMANO[1] - MARGEN - TAMANOS_FUENTE["pie"] * 2
+
+    # Escribe un texto envuelto; si no cabe, la última línea que entra termina
+    # en "…". Devuelve False cuando la tarjeta ya está llena
+    def texto(self, texto, estilo="texto", color=COLOR_TEXTO, sangria=0, espacio=0.35):
+        fuente, completa = _fuente(estilo)
+        alto = round(TAMANOS_FUENTE[estilo] * 1.3)
+        lineas = _envolver(texto if completa else _ascii(texto), fuente, self.ancho - sangria)
+        for k, linea in enumerate(lineas):
+            if self.y + alto > self.limite:
+                return False
+            cortada = k < len(lineas) - 1 and self.y + 2 * alto > self.limite
+            if cortada:
+                palabras = linea.split()
+                linea = " ".join(palabras[:-1] or palabras) + ("…" if completa else "...")
+            self.dibujo.text((MARGEN + sangria, self.y), linea, font=fuente, fill=color)
+            self.y += alto
+            if cortada:
+                return False
+        self.y += round(TAMANOS_FUENTE[estilo] * espacio)
+        return True
+
+    def seccion(self, titulo, lineas):
+        # Un título solo al pie de la tarjeta no sirve: tiene que caber una línea más
+        if self.y + round((TAMANOS_FUENTE["seccion"] + TAMANOS_FUENTE["texto"]) * 1.3) > self.limite:
+            return False
+        if not self.texto(titulo, "seccion", COLOR_TITULO, espacio=0.15):
+            return False
+        for linea in lineas:
+            if not self.texto(linea, sangria=10, espacio=0.1):
+                return False
+        self.y += round(TAMANOS_FUENTE["texto"] * 0.4)
+        return True
+
+    # Foto centrada, reducida para que quepa en `alto` px
+    def foto(self, ruta, alto):
+        with Image.open(ruta) as foto:
+            foto.thumbnail((self.ancho, alto))
+            self.imagen.paste(foto.convert("RGB"), (MARGEN + (self.ancho - foto.width) // 2, self.y))
+            self.y += foto.height + round(TAMANOS_FUENTE["texto"] * 0.8)
+
+    def pie(self, texto):
+        fuente, _ = _fuente("pie")
+        ancho = fuente.getlength(texto)
+        self.dibujo.text(
+            ((TAMANO[0] - ancho) / 2, TAMANO[1] - MARGEN - TAMANOS_FUENTE["pie"]),
+            texto, font=fuente, fill=COLOR_PIE,
+        )
+
+
+def _porciones(cantidad, litros):
+    if litros is not None:
+        return f"{litros:g} litros".replace(".", ",")
+    return "1 cóctel" if cantidad == 1 else f"{cantidad:g} cócteles"
+
+
+# Dibuja la tarjeta de un cóctel para el pedido indicado (como en escalado.escalar)
+def dibujar(datos, coctel, cantidad=1, litros=None, unidad="ml"):
+    info = detalle(datos, coctel)
+    fila = datos.receta(coctel)
+    if litros is not None:
+        unidad = "ml"  # en volumen total la app muestra siempre ml
+
+    lienzo = _Lienzo()
+    lienzo.texto(coctel, "titulo", COLOR_TITULO, espacio=0.3)
+    if info.imagen:
+        # Derivada cacheada en .cache/imagenes (ver imagenes.py)
+        lienzo.foto(derivada(info.imagen, "impresion"), alto=TAMANO[1] // 4)
+
+    # Los textos largos (preparación y jarabes) van al final: si no caben, se
+    # cortan ellos y no los datos del servicio
+    tecnica = datos.tecnica(fila["tecnica"])
+    secciones = [
+        (f"Ingredientes ({_porciones(cantidad, litros)})",
+         [f"• {linea}" for linea in escalar(datos, [(coctel, cantidad, litros)], unidad)["linea"]]),
+        ("Técnica", [
+            f"{tecnica['nombre_español']} ({fila['tecnica']})" if tecnica is not None else str(fila["tecnica"])
+        ]),
+        ("Cristalería", [
+            f"{fila['vaso']} – {int(fila['capacidad_vaso_sin_hielo'])} ml · "
+            + ("con hielo" if info.con_hielo else "sin hielo")
+        ]),
+        ("Garnitura", [", ".join(info.garnitura)] if info.garnitura else []),
+        ("Preparación", [_texto_plano(info.preparacion)] if info.preparacion is not None else []),
+        *[(jarabe, [_texto_plano(preparacion)]) for jarabe, preparacion in info.jarabes],
+    ]
+    for titulo, lineas in secciones:
+        if lineas and not lienzo.seccion(titulo, lineas):
+            break
+    lienzo.pie("Club de Licores · clubdelicores@gmail.com")
+    return lienzo.imagen
+
+
+def _codificar(imagen, formato):
+    buffer = io.BytesIO()
+    if formato == "PDF":
+        imagen.save(buffer, format="PDF", resolution=DPI)
+    else:
+        # Compresión mínima: a este tamaño la máxima tarda el doble y ahorra poco
+        imagen.save(buffer, format="PNG", compress_level=1, dpi=(DPI, DPI))
+    return buffer.getvalue()
+
+
+# Trabajo de un proceso del pool: (posición, coctel, cantidad, litros,
+# unidad, formato) -> (nombre en el zip, bytes). Cada proceso carga los datos
+# una vez (del artefacto compilado, ver datos.py) y los reutiliza
+def _tarjeta(trabajo):
+    posicion, coctel, cantidad, litros, unidad, formato = trabajo
+    imagen = dibujar(cargar_datos(), coctel, cantidad, litros, unidad)
+    return f"{posicion:03d}-{slug(coctel)}{FORMATOS[formato]}", _codificar(imagen, formato)
+
+
+# === Pool de procesos ===
+
+# Un pool por proceso, creado al primer uso y reutilizado por las
+# exportaciones siguientes. Los procesos nuevos se crean con "spawn": el
+# servidor tiene hilos y no conviene copiarlo con fork
+_pool = None  # (pool, número de procesos)
+_pool_lock = threading.Lock()
+
+
+def _obtener_pool(procesos=None):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            procesos = procesos or os.cpu_count() or 1
+            pool = ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context("spawn"))
+            _pool = (pool, procesos)
+        return _pool
+
+
+# Resultados del pool en el orden de los trabajos, con a lo sumo `en_vuelo`
+# tarjetas pedidas a la vez
+def _en_orden(pool, trabajos, en_vuelo):
+    pendientes = deque()
+    for trabajo in trabajos:
+        pendientes.append(pool.submit(_tarjeta, trabajo))
+        if len(pendientes) >= en_vuelo:
+            yield pendientes.popleft().result()
+    while pendientes:
+        yield pendientes.popleft().result()
+
+
+# === Zip en streaming ===
+
+# Archivo de solo escritura que acumula lo escrito hasta que se retira
+# (ZipFile escribe en él sin necesidad de seek)
+class _Tubo(io.RawIOBase):
+    def __init__(self):
+        self._partes = []
+
+    def writable(self):
+        return True
+
+    def write(self, contenido):
+        self._partes.append(bytes(contenido))
+        return len(contenido)
+
+    def retirar(self):
+        contenido = b"".join(self._partes)
+        self._partes = []
+        return contenido
+
+
+# Genera el zip de las tarjetas de los pedidos, en trozos de bytes, a medida
+# que el pool las termina. pedidos: lista de (coctel, cantidad, litros)
+def zip_tarjetas(pedidos, unidad="ml", formato="PDF", procesos=None):
+    pool, procesos = _obtener_pool(procesos)
+    trabajos = [
+        (posicion, coctel, cantidad, litros, unidad, formato)
+        for posicion, (coctel, cantidad, litros) in enumerate(pedidos, start=1)
+    ]
+    en_vuelo = EN_VUELO_POR_PROCESO * procesos
+
+    tubo = _Tubo()
+    # PNG y PDF ya vienen comprimidos: se guardan tal cual
+    with zipfile.ZipFile(tubo, "w", compression=zipfile.ZIP_STORED) as archivo:
+        for nombre, contenido in _en_orden(pool, trabajos, en_vuelo):
+            archivo.writestr(nombre, contenido)
+            yield tubo.retirar()
+    yield tubo.retirar()
+
+
+# Pedidos de 1 cóctel (o `cantidad`) de cada uno; sin cócteles, todo el catálogo
+def pedidos_catalogo(datos, cocteles=None, cantidad=1):
+    if not cocteles:
+        cocteles = sorted({c for c in datos.recetas["coctel"] if isinstance(c, str)})
+    return [(coctel, cantidad, None) for coctel in cocteles]
+
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    formato = "PNG" if "--png" in argumentos else "PDF"
+    unidad = "oz" if "--oz" in argumentos else "ml"
+    cantidad = 1
+    if "--cantidad" in argumentos:
+        i = argumentos.index("--cantidad")
+        cantidad = int(argumentos[i + 1])
+        del argumentos[i:i + 2]
+        if not 0 < cantidad <= MAXIMO_COCTELES:
+            sys.exit(f"--cantidad debe estar entre 1 y {MAXIMO_COCTELES}")
+    salida, *cocteles = [a for a in argumentos if a not in ("--png", "--oz")] or ["tarjetas.zip"]
+
+    datos = cargar_datos()
+    desconocidos = [c for c in cocteles if datos.receta(c) is None]
+    if desconocidos:
+        sys.exit(f"Cócteles desconocidos: {', '.join(desconocidos)}")
+    pedidos = pedidos_catalogo(datos, cocteles, cantidad)
+    with open(salida, "wb") as f:
+        for trozo in zip_tarjetas(pedidos, unidad, formato):
+            f.write(trozo)
+    print(f"{len(pedidos)} tarjetas en {salida}")
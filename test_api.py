@@ -0,0 +1,32 @@
+import pytest
+
+from api import ErrorConsulta, _numero, _receta
+from datos import cargar_datos
+
+
+@pytest.mark.parametrize("valor", ["inf", "-inf", "Infinity", "nan", "1e999"])
+def test_numero_no_finito(valor):
+    with pytest.raises(ErrorConsulta) as error:
+        _numero(valor, "cantidad", 10000)
+    assert error.value.estado == 400
+
+
+@pytest.mark.parametrize("cantidad, litros", [("inf", None), (None, "inf")])
+def test_receta_no_finita(cantidad, litros):
+    datos = cargar_datos()
+    with pytest.raises(ErrorConsulta) as error:
+        _receta(datos, "Negroni", cantidad, litros, "ml")
+    assert error.value.estado == 400
+
+
+def test_numero_valido():
+    assert _numero("2.5", "litros", 1000) == 2.5
+    assert _numero("", "litros", 1000) is None
+
+
+@pytest.mark.parametrize("cantidad, litros", [("1e308", None), ("10001", None), (None, "1e308"), (None, "1001")])
+def test_receta_demasiado_grande(cantidad, litros):
+    datos = cargar_datos()
+    with pytest.raises(ErrorConsulta) as error:
+        _receta(datos, "Negroni", cantidad, litros, "ml")
+    assert error.value.estado == 400
@@ -0,0 +1,30 @@
+import pytest
+
+import enlaces
+
+
+@pytest.mark.parametrize("estado", [
+    {"modo_forzado": enlaces.MODOS["cantidad"], "cantidad": 10000, "unidad_label": enlaces.UNIDADES["oz"]},
+    {"modo_forzado": enlaces.MODOS["cantidad"], "cantidad": 3},
+    {"modo_forzado": enlaces.MODOS["litros"], "litros": 999.1234567},
+    {"modo_forzado": enlaces.MODOS["litros"], "litros": 2.5},
+    {"coctel_sel": "Negroni", "licor_sel": "Gin", "palabra_clave_input": "limón"},
+])
+def test_ida_y_vuelta(estado):
+    # Los valores predeterminados no se escriben en la URL
+    parametros = {k: v for k, v in enlaces.escribir(estado).items() if v is not None}
+    assert {**enlaces.PREDETERMINADOS, **enlaces.leer(parametros)} == {**enlaces.PREDETERMINADOS, **estado}
+
+
+def test_predeterminados_fuera_de_la_url():
+    parametros = enlaces.escribir({**enlaces.PREDETERMINADOS, "coctel_sel": "Negroni"})
+    assert {k: v for k, v in parametros.items() if v is not None} == {"coctel": "Negroni"}
+
+
+def test_valores_invalidos():
+    assert enlaces.leer({"cantidad": "-3", "litros": "inf", "modo": "otro", "unidad": "l"}) == {}
+
+
+def test_valores_demasiado_grandes():
+    assert enlaces.leer({"cantidad": "1e308", "litros": "1e308"}) == {}
+    assert enlaces.leer({"cantidad": "10000", "litros": "1000"}) == {"cantidad": 10000, "litros": 1000.0}